@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : analysis.py
+# Description : jeux Othello, analyse en masse de positions (données d'apprentissage)
+#               chaque position est évaluée par alphabeta à profondeur fixe ou résolue exactement,
+#               en parallèle, résultats en binaire compact (ou NPZ), reprise après interruption
+#               usage: python3 analysis.py positions.txt -o results.bin --depth 4 --solve 14
+#                      python3 analysis.py --random 100000 -o results.bin --npz results.npz
+# modification: 2026/10/17
+########################################################################
+
+import os, sys, time, random, struct, argparse, itertools, multiprocessing
+from bitboard import BitboardGame
+from transposition import TranspositionTable
+from search import Search
+from endgame import EndgameSolver, random_position
+from server import encode_board, decode_board
+from game import SearchTimeout
+
+#result record: black and white bitboards, player to move (0: black, 1: white), depth (-1: solved exactly),
+#value for the player to move (disc difference when solved), best move (0: none)
+RECORD = struct.Struct('<QQBbhB')
+DTYPE = [('black', '<u8'), ('white', '<u8'), ('player', 'u1'), ('depth', 'i1'), ('value', '<i2'), ('move', 'u1')]
+EXACT = -1
+
+_worker = {}    #state of a worker process: game, search and solver
+
+def _init_worker(depth, solve_empties, solve_seconds):
+    game = BitboardGame()
+    _worker['game'] = game
+    _worker['search'] = Search(game, TranspositionTable(game))
+    _worker['solver'] = EndgameSolver(game, time_limit=solve_seconds)
+    _worker['depth'], _worker['solve'] = depth, solve_empties
+
+#(player, board) analysed: the packed result record
+def analyse(player, board):
+    game, search, solver = _worker['game'], _worker['search'], _worker['solver']
+    black, white = game.to_bitboards(board)
+    depth = _worker['depth']
+    if not game.any_legal_move(player, board) and not game.any_legal_move(game.opponent(player), board):
+        return RECORD.pack(black, white, player == game.WHITE, EXACT, game.score(player, board), 0)
+    if game.empty_pieces(board) <= _worker['solve']:
+        try:
+            value, move = solver.solve(player, board)
+            return RECORD.pack(black, white, player == game.WHITE, EXACT, value, move or 0)
+        except SearchTimeout:
+            pass
+    evaluate = game.weighted_score if game.empty_pieces(board) > game.EMPTY_THRESOLD else game.final_value
+    search.table.use_evaluate(evaluate)
+    search.new_search(player, board, evaluate)
+    value, move = game.alphabeta(player, board, game.MIN_VALUE, game.MAX_VALUE, depth, evaluate, search)
+    return RECORD.pack(black, white, player == game.WHITE, depth, max(-32768, min(32767, value)), move or 0)
+
+def _analyse_task(position):
+    return analyse(*position)
+
+#positions of a text file: one "player board" per line (see server.encode_board), such as "@ ......o@......"
+def read_positions(game, lines):
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            player, text = line.split()
+            yield player, decode_board(game, text)
+
+def format_position(game, player, board):
+    return '%s %s' % (player, encode_board(game, board))
+
+#count random positions with 1 to 59 empties, always the same ones for a given seed
+def random_positions(game, count, seed=0):
+    rnd = random.Random(seed)
+    for n in range(count):
+        yield random_position(game, rnd.randint(1, 59), rnd)
+
+#number of complete records of the output file, cutting a record partly written by an interrupted run
+def completed(path):
+    if not os.path.exists(path):
+        return 0
+    count = os.path.getsize(path) // RECORD.size
+    with open(path, 'r+b') as f:
+        f.truncate(count * RECORD.size)
+    return count
+
+#analyse the positions (an iterable of (player, board)) into the binary file out, in the order of the positions
+#resume: the positions already in out are skipped, the analysis goes on after them
+#returns the number of positions analysed by this run
+def run(positions, out, depth=4, solve_empties=14, solve_seconds=10.0, workers=None, resume=True, report=10.0):
+    done = completed(out) if resume else 0
+    positions = itertools.islice(positions, done, None)
+    count, start, last = 0, time.monotonic(), time.monotonic()
+    with open(out, 'ab' if resume else 'wb') as f, \
+         multiprocessing.Pool(workers, initializer=_init_worker, initargs=(depth, solve_empties, solve_seconds)) as pool:
+        for record in pool.imap(_analyse_task, positions, chunksize=16):
+            f.write(record)
+            count += 1
+            if time.monotonic() - last >= report:
+                last = time.monotonic()
+                f.flush()
+                print('%d positions, %.1f positions/s' % (done + count, count / (last - start)), file=sys.stderr)
+    elapsed = time.monotonic() - start
+    print('%d positions analysed (%d skipped) in %.1fs: %.1f positions/s' % (count, done, elapsed, count / elapsed if elapsed else 0),
+          file=sys.stderr)
+    return count
+
+#records of a binary file: numpy structured array if numpy is installed, else list of tuples (see RECORD)
+def load(path):
+    try:
+        import numpy as np
+    except ImportError:
+        with open(path, 'rb') as f:
+            data = f.read()
+        return list(RECORD.iter_unpack(data[:len(data) // RECORD.size * RECORD.size]))
+    return np.fromfile(path, dtype=np.dtype(DTYPE))
+
+#convert a binary file to a compressed NPZ file, one array per field
+def to_npz(path, npz_path):
+    import numpy as np
+    records = load(path)
+    np.savez_compressed(npz_path, **{name: records[name] for name, kind in DTYPE})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='bulk Othello position analysis')
+    parser.add_argument('positions', nargs='?', help='text file of "player board" lines (default: --random positions)')
+    parser.add_argument('-o', '--out', default='analysis.bin', help='binary results file, resumed if it exists')
+    parser.add_argument('--random', type=int, default=0, help='analyse this many random positions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--depth', type=int, default=4, help='alphabeta depth')
+    parser.add_argument('--solve', type=int, default=14, help='positions with up to this many empties are solved exactly')
+    parser.add_argument('--solve-seconds', type=float, default=10.0, help='time limit of an exact solve, then alphabeta')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='processes (default: one per core)')
+    parser.add_argument('--restart', action='store_true', help='overwrite the results file instead of resuming')
+    parser.add_argument('--npz', help='also write the results to this NPZ file (needs numpy)')
+    args = parser.parse_args()
+    game = BitboardGame()
+    if args.positions:
+        source = open(args.positions)
+        positions = read_positions(game, source)
+    else:
+        positions = random_positions(game, args.random, args.seed)
+    run(positions, args.out, args.depth, args.solve, args.solve_seconds, args.workers, not args.restart)
+    if args.npz:
+        to_npz(args.out, args.npz)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : benchmark.py
+# Description : jeux Othello, mesure de performance des fonctions du jeu, sans matériel (ni matrice ni GPIO)
+#               sur un corpus fixe de positions d'ouverture, de milieu et de fin de partie
+#               usage: python3 benchmark.py [--save FILE] [--compare FILE] [--threshold 0.2]
+# modification: 2026/10/17
+########################################################################
+
+import sys, time, json, random, platform, argparse
+from game import Game
+from bitboard import BitboardGame
+from search import Search
+from transposition import TranspositionTable
+from endgame import EndgameSolver
+
+#fixed positions: (phase, player to move, the 64 valid squares from 11 to 88)
+CORPUS = [
+    ('opening', '@', '....................o.....@@o.....@@o.....o.o@..................'),
+    ('opening', 'o', '...o......@@@.....o@o......o@o.....@o@.......@.......@..........'),
+    ('opening', '@', '..ooo@.....oo@.....@o......@@.....@@@@...@..o........o..........'),
+    ('midgame', '@', '.................ooo.@.o.oo@@@o.@@o@@@@..@.oo.o...@.@o......@...'),
+    ('midgame', 'o', '.@.o.@.@.@@ooo@..@@@oo..o@o@oo..o@o@@...oo@o.@..o..@............'),
+    ('midgame', '@', '....o.o.....oo..@@@.o...@@@@o...@@@@o@.@oo@ooo@o.@@@oo..@.@o.o@.'),
+    ('endgame', '@', '...o.@..o@oo.@..oo@o@@@.@@oo@@@o@ooooo@o@@ooooo@@@oooo......o.@.'),
+    ('endgame', 'o', '.oo.....@@@@@@@@@o@@oooooo@@ooo.oooo@oo..o@@.@.ooooo@@@.@@@.@@..'),
+    ('endgame', '@', 'oooo.o..@.oo@o...oo@@oo.oo@o@o..o@o@@@o.@@@@oooo@@oo@@o.@@@@@@@o'),
+]
+PHASES = ('opening', 'midgame', 'endgame')
+
+#corpus positions of a phase (all if None) as (player, board)
+def corpus_positions(game, phase=None):
+    positions = []
+    for position_phase, player, squares in CORPUS:
+        if phase is None or phase == position_phase:
+            board = [game.OUTER] * 100
+            for sq, piece in zip(game.valid_squares, squares):
+                board[sq] = piece
+            positions.append((player, board))
+    return positions
+
+#positions (player, board) met during games played at random, always the same ones for a given seed
+def random_positions(game, count=200, seed=1):
+    rnd = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board, player = game.initial_board(), game.BLACK
+        while player is not None and len(positions) < count:
+            positions.append((player, list(board)))
+            game.make_move(rnd.choice(game.legal_moves(player, board)), player, board)
+            player = game.next_player(board, player)
+    return positions
+
+#legal moves as computed before the precomputed tables: 8 directions walked from every empty square
+def walk_legal_moves(game, player, board):
+    return [sq for sq in game.valid_squares
+            if board[sq] == game.EMPTY and any(game.find_bracket(sq, player, board, d) for d in game.DIRECTIONS)]
+
+#calls per second of function(player, board) over the positions, during at least duration seconds
+def calls_per_second(function, positions, duration=1.0):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for player, board in positions:
+            function(player, board)
+        calls += len(positions)
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return calls / elapsed
+
+#legal_moves calls per second: direction walking, precomputed rays and frontier, bitboards
+def bench_legal_moves(duration=1.0):
+    game, bitgame = Game(), BitboardGame()
+    positions = random_positions(game)
+    for name, function in (('walk 8 directions', lambda player, board: walk_legal_moves(game, player, board)),
+                           ('rays + frontier', game.legal_moves),
+                           ('bitboards', bitgame.legal_moves)):
+        print('legal_moves %-18s %8.0f calls/s' % (name, calls_per_second(function, positions, duration)))
+
+
+#play and take back every legal move of player
+def make_unmake(game, player, board):
+    for move in game.legal_moves(player, board):
+        game.unmake_move(move, player, board, game.make_move_undo(move, player, board))
+
+#calls per second of the game hot paths over the whole corpus: {name: calls/s}
+def bench_operations(game, duration=1.0):
+    positions = corpus_positions(game)
+    return {name: calls_per_second(function, positions, duration) for name, function in (
+        ('legal_moves', game.legal_moves),
+        ('any_legal_move', game.any_legal_move),
+        ('make_unmake', lambda player, board: make_unmake(game, player, board)),
+        ('weighted_score', game.weighted_score),
+        ('score', game.score),
+        ('next_player', lambda player, board: game.next_player(board, player)))}
+
+#alphabeta with a new Search (transposition table, move ordering) on each phase, depth 1 to max_depth:
+#({name: nodes/s}, {name: seconds to complete the depth over the phase positions, best of repeat runs})
+def bench_search(game, max_depth=5, repeat=3):
+    rates, times = {}, {}
+    for phase in PHASES[:2]:
+        nodes, elapsed = 0, 0.0
+        for depth in range(1, max_depth + 1):
+            runs = []
+            for run in range(repeat):
+                depth_time = 0.0
+                for player, board in corpus_positions(game, phase):
+                    search = Search(game, TranspositionTable(game))
+                    search.new_search(player, board, game.weighted_score)
+                    start = time.perf_counter()
+                    game.alphabeta(player, board, game.MIN_VALUE, game.MAX_VALUE, depth, game.weighted_score, search)
+                    depth_time += time.perf_counter() - start
+                    nodes += search.nodes
+                runs.append(depth_time)
+                elapsed += depth_time
+            times['alphabeta %s depth %d' % (phase, depth)] = min(runs)     #the least disturbed run
+        rates['alphabeta %s' % phase] = nodes / elapsed
+    maximizer = game.maximizer()
+    rates['maximizer'] = calls_per_second(maximizer, corpus_positions(game, 'midgame'), 0.5)
+    solver = EndgameSolver(game, time_limit=None)
+    nodes, elapsed = 0, 0.0
+    for player, board in corpus_positions(game, 'endgame')[1:]:     #15 and 12 empties
+        start = time.perf_counter()
+        solver.solve(player, board)
+        elapsed += time.perf_counter() - start
+        nodes += solver.nodes
+    rates['endgame solver'] = nodes / elapsed
+    times['endgame solve 15+12 empties'] = elapsed
+    return rates, times
+
+#whole suite on both backends: {'machine': ..., 'rates': {name: per second}, 'times': {name: seconds}}
+def run_suite(duration=1.0, max_depth=5):
+    result = {'machine': platform.machine(), 'python': platform.python_version(), 'rates': {}, 'times': {}}
+    for backend, game in (('list', Game()), ('bitboard', BitboardGame())):
+        for name, rate in bench_operations(game, duration).items():
+            result['rates']['%s %s' % (backend, name)] = rate
+        rates, times = bench_search(game, max_depth)
+        for name, rate in rates.items():
+            result['rates']['%s %s' % (backend, name)] = rate
+        for name, seconds in times.items():
+            result['times']['%s %s' % (backend, name)] = seconds
+    return result
+
+#measures slower than baseline by more than threshold (0.2: 20%): [(name, baseline, current)]
+#times also get slack seconds, the shortest ones being mostly timer and scheduler noise
+def compare(result, baseline, threshold=0.2, slack=0.005):
+    regressions = []
+    for name, rate in result['rates'].items():
+        if name in baseline['rates'] and rate < baseline['rates'][name] * (1 - threshold):
+            regressions.append((name, baseline['rates'][name], rate))
+    for name, seconds in result['times'].items():
+        if name in baseline['times'] and seconds > baseline['times'][name] * (1 + threshold) + slack:
+            regressions.append((name, baseline['times'][name], seconds))
+    return regressions
+
+def print_result(result, baseline=None):
+    for kind, unit in (('rates', '/s'), ('times', 's')):
+        for name, value in result[kind].items():
+            line = '%-45s %12.4f %s' % (name, value, unit)
+            if baseline is not None and name in baseline[kind]:
+                line += '   baseline %12.4f (%+.0f%%)' % (baseline[kind][name], 100 * (value / baseline[kind][name] - 1))
+            print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='game.Game hot paths benchmark')
+    parser.add_argument('--save', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', help='JSON baseline to compare with: exit code 1 on regression')
+    parser.add_argument('--threshold', type=float, default=0.2, help='tolerated slowdown (default 0.2: 20%%)')
+    parser.add_argument('--duration', type=float, default=1.0, help='seconds per operation measure')
+    parser.add_argument('--depth', type=int, default=5, help='maximum alphabeta depth')
+    parser.add_argument('--legal-moves', action='store_true', help='only compare the legal_moves implementations')
+    args = parser.parse_args()
+    if args.legal_moves:
+        bench_legal_moves(args.duration)
+        sys.exit(0)
+    result = run_suite(args.duration, args.depth)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_result(result, baseline)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(result, f, indent=1, sort_keys=True)
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold)
+        for name, before, after in regressions:
+            print('REGRESSION %s: %.4f -> %.4f' % (name, before, after))
+        sys.exit(1 if regressions else 0)
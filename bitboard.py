@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : bitboard.py
+# Description : jeux Othello, plateau représenté par deux entiers 64 bits
+#               (un pour les pions noirs, un pour les pions blancs)
+# modification: 2026/10/17
+########################################################################
+
+from operator import itemgetter
+from game import Game
+
+#Square sq = 10*row + col (row, col from 1 to 8) is stored in bit 8*(row-1) + (col-1).
+#
+#    bit:  0  1  2  3  4  5  6  7      squares: 11 12 ... 18
+#          8  9 ...            15               21 ...    28
+#          ...                                  ...
+#         56 57 ...            63               81 ...    88
+FULL   = 0xFFFFFFFFFFFFFFFF
+A_FILE = 0x0101010101010101             #first column (col 1)
+H_FILE = A_FILE << 7                    #last column (col 8)
+NOT_A  = FULL ^ A_FILE
+NOT_H  = FULL ^ H_FILE
+
+SQUARES = [10*(k//8 + 1) + k%8 + 1 for k in range(64)]       #bit index -> square
+BITS = {sq: k for k, sq in enumerate(SQUARES)}                #square -> bit index
+MASKS = {sq: 1 << k for k, sq in enumerate(SQUARES)}          #square -> bit mask
+
+#the 8 directions as (shift, mask) pairs: positive shifts go down/right (<<), negative ones up/left (>>)
+#mask removes the bits wrapping from one side of the board to the other one.
+LEFT_SHIFTS  = ((1, NOT_A), (8, FULL), (9, NOT_A), (7, NOT_H))   # RIGHT, DOWN, DOWN_RIGHT, DOWN_LEFT
+RIGHT_SHIFTS = ((1, NOT_H), (8, FULL), (9, NOT_H), (7, NOT_A))   # LEFT, UP, UP_LEFT, UP_RIGHT
+
+
+#number of bits set
+def popcount(x):
+    return bin(x).count('1')
+
+#squares of the bits set in x, in increasing order
+def bits_to_squares(x):
+    squares = []
+    while x:
+        low = x & -x
+        squares.append(SQUARES[low.bit_length() - 1])
+        x ^= low
+    return squares
+
+#all the legal moves of own against opp, as a bitboard
+#the 8 directions are flooded together, 6 steps max (dumb7fill)
+def legal_moves(own, opp):
+    empty = FULL ^ (own | opp)
+    moves = 0
+    for shift, mask in LEFT_SHIFTS:
+        w = opp & mask
+        t = w & (own << shift)
+        t |= w & (t << shift)
+        t |= w & (t << shift)
+        t |= w & (t << shift)
+        t |= w & (t << shift)
+        t |= w & (t << shift)
+        moves |= (t << shift) & mask
+    for shift, mask in RIGHT_SHIFTS:
+        w = opp & mask
+        t = w & (own >> shift)
+        t |= w & (t >> shift)
+        t |= w & (t >> shift)
+        t |= w & (t >> shift)
+        t |= w & (t >> shift)
+        t |= w & (t >> shift)
+        moves |= (t >> shift) & mask
+    return moves & empty
+
+#discs of opp flipped when own plays on bit mask move, as a bitboard (0: illegal move)
+def flips(move, own, opp):
+    flipped = 0
+    for shift, mask in LEFT_SHIFTS:
+        w = opp & mask
+        line = 0
+        x = (move << shift) & w
+        while x:
+            line |= x
+            x = (x << shift) & w
+        if (line << shift) & mask & own:
+            flipped |= line
+    for shift, mask in RIGHT_SHIFTS:
+        w = opp & mask
+        line = 0
+        x = (move >> shift) & w
+        while x:
+            line |= x
+            x = (x >> shift) & w
+        if (line >> shift) & mask & own:
+            flipped |= line
+    return flipped
+
+
+class BitboardGame(Game):
+    """Game adapter running on bitboards.
+
+    Boards are still the 100-element lists of Game, so every strategy (alphabeta, maximizer, ...) and
+    piOthello.Application run unchanged. Each hot call converts the list into two 64 bits integers,
+    then move generation and flips are shift-and-mask operations over the 8 directions together.
+    Single square calls (is_legal, make_move) walk the precomputed rays of Game: converting the board costs more.
+    """
+    def __init__(self):
+        super().__init__()
+        self.pick = itemgetter(*reversed(SQUARES))      #valid squares from bit 63 down to bit 0
+        self.BLACK_BITS = str.maketrans({self.BLACK: '1', self.WHITE: '0', self.EMPTY: '0'})
+        self.WHITE_BITS = str.maketrans({self.BLACK: '0', self.WHITE: '1', self.EMPTY: '0'})
+
+    #convert a board into (black, white) bitboards
+    def to_bitboards(self, board):
+        cells = ''.join(self.pick(board))
+        return int(cells.translate(self.BLACK_BITS), 2), int(cells.translate(self.WHITE_BITS), 2)
+
+    #(player, opponent) bitboards of a board
+    def own_opp(self, player, board):
+        black, white = self.to_bitboards(board)
+        return (black, white) if player == self.BLACK else (white, black)
+
+    #convert (black, white) bitboards into a board
+    def from_bitboards(self, black, white):
+        board = [self.OUTER] * 100
+        for k, sq in enumerate(SQUARES):
+            mask = 1 << k
+            board[sq] = self.BLACK if black & mask else self.WHITE if white & mask else self.EMPTY
+        return board
+
+    #calculates empty pices left on the board
+    def empty_pieces(self, board):
+        return board.count(self.EMPTY)
+
+    #Get a list of all legal moves for player.
+    def legal_moves(self, player, board):
+        return bits_to_squares(legal_moves(*self.own_opp(player, board)))
+
+    #Can player make any moves?
+    def any_legal_move(self, player, board):
+        return legal_moves(*self.own_opp(player, board)) != 0
+
+    #Compute player's score (number of player's pieces minus opponent's).
+    def score(self, player, board):
+        own, opp = self.own_opp(player, board)
+        return popcount(own) - popcount(opp)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : book.py
+# Description : jeux Othello, bibliothèque d'ouvertures
+#               fichier binaire trié par clé de Zobrist (positions symétriques confondues),
+#               lu au travers d'un mmap: le fichier n'est pas chargé en mémoire
+#               construction: python3 book.py build -o book.bin --self-play 200 --depth 3
+#                             python3 book.py build -o book.bin --import games.txt --records games.rec
+# modification: 2026/10/17
+########################################################################
+
+import mmap, struct, random, argparse
+from transposition import ZobristHasher
+from symmetry import canonical_key, transform_move, restore_move
+from record import GameLog, format_move, parse_transcript, replay
+
+
+class OpeningBook:
+    """Book of the best known move of opening positions.
+
+    The file is a header (MAGIC, number of records) followed by fixed size records (key, move, games, score)
+    sorted by key. The key is the smallest Zobrist hash of the 8 symmetric boards, and the move is stored
+    in the orientation of that board: one record serves the 8 symmetric positions. Lookups are binary
+    searches in a read-only mmap of the file.
+    """
+    MAGIC = b'OTHBOOK1'
+    HEADER = struct.Struct('<8sI')
+    RECORD = struct.Struct('<QBxHh')    #key, move, games played, mean final score for the player to move
+
+    def __init__(self, game, path):
+        self.game = game
+        self.hasher = ZobristHasher(game)
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC:
+            raise ValueError('%s is not an opening book' % path)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    #record (key, move, games, score) of key, None if not in the book
+    def find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self.RECORD.unpack_from(self.map, self.HEADER.size + mid * self.RECORD.size)
+            if record[0] < key:
+                lo = mid + 1
+            elif record[0] > key:
+                hi = mid
+            else:
+                return record
+        return None
+
+    #book move of player on board, None if the position is not in the book
+    def lookup(self, player, board):
+        key, n = canonical_key(self.hasher, player, board)
+        record = self.find(key)
+        if record is None:
+            return None
+        move = restore_move(record[1], n)
+        return move if self.game.is_valid(move) and self.game.is_legal(move, player, board) else None
+
+    #write a book file from {key: {canonical move: [games, total score]}}, keeping moves played min_games times
+    @classmethod
+    def write(cls, path, stats, min_games=1):
+        records = []
+        for key, moves in stats.items():
+            candidates = [(total / games, games, move) for move, (games, total) in moves.items() if games >= min_games]
+            if candidates:
+                score, games, move = max(candidates)
+                records.append((key, move, min(games, 0xFFFF), int(round(score))))
+        records.sort()
+        with open(path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, len(records)))
+            for record in records:
+                f.write(cls.RECORD.pack(*record))
+        return len(records)
+
+
+class BookBuilder:
+    """Collects the moves played in the first plies of games with their final score, then writes the book."""
+    def __init__(self, game, plies=12):
+        self.game = game
+        self.plies = plies
+        self.stats = {}     #key -> {canonical move: [games, total final score for the player to move]}
+        self.hasher = ZobristHasher(game)
+        self.skipped = 0    #games of import_transcripts and import_log left out, being unreadable or illegal
+
+    #add an imported game, False if it is left out (see skipped)
+    def _import_game(self, parse, text):
+        try:
+            self.add_game(parse(text))
+            return True
+        except ValueError:
+            self.skipped += 1
+            return False
+
+    #add a game given by its moves, passes being deduced from the rules
+    def add_game(self, moves):
+        game = self.game
+        positions = []
+        for player, board, move in replay(game, moves):
+            if player is None:
+                black_score = game.score(game.BLACK, board)
+            elif len(positions) < self.plies:
+                key, n = canonical_key(self.hasher, player, board)
+                positions.append((player, key, transform_move(move, n)))
+        for player, key, move in positions:
+            entry = self.stats.setdefault(key, {}).setdefault(move, [0, 0])
+            entry[0] += 1
+            entry[1] += black_score if player == game.BLACK else -black_score
+
+    #add games written as transcripts, such as "f5d6c3d3c4f4", one per line, returns the number of games added
+    def import_transcripts(self, lines):
+        count = 0
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                count += self._import_game(parse_transcript, line)
+        return count
+
+    #add the games of a game log (see record.py), read one at a time, returns the number of games added
+    def import_log(self, path):
+        count = 0
+        for moves in GameLog(path):
+            count += self._import_game(list, moves)
+        return count
+
+    #add games played by strategy against itself, opening with random_moves random moves
+    def self_play(self, strategy, games, random_moves=6, seed=0):
+        game = self.game
+        rnd = random.Random(seed)
+        for n in range(games):
+            board, player = game.initial_board(), game.BLACK
+            moves = []
+            while player is not None:
+                if len(moves) < random_moves:
+                    move = rnd.choice(game.legal_moves(player, board))
+                else:
+                    move = game.get_move(strategy, player, board)
+                moves.append(move)
+                game.make_move(move, player, board)
+                player = game.next_player(board, player)
+            self.add_game(moves)
+
+    def write(self, path, min_games=1):
+        return OpeningBook.write(path, self.stats, min_games)
+
+
+if __name__ == '__main__':
+    from bitboard import BitboardGame
+    parser = argparse.ArgumentParser(description='opening book tool')
+    parser.add_argument('command', choices=['build', 'show'])
+    parser.add_argument('-o', '--out', default='book.bin', help='book file')
+    parser.add_argument('--import', dest='transcripts', action='append', default=[], help='transcripts file, one game per line')
+    parser.add_argument('--records', action='append', default=[], help='game log of record.py')
+    parser.add_argument('--self-play', type=int, default=0, help='games of alphabeta against itself')
+    parser.add_argument('--depth', type=int, default=3, help='alphabeta depth of the self-play games')
+    parser.add_argument('--plies', type=int, default=12, help='plies of each game stored in the book')
+    parser.add_argument('--min-games', type=int, default=1, help='games needed for a move to be kept')
+    args = parser.parse_args()
+    game = BitboardGame()
+    if args.command == 'build':
+        builder = BookBuilder(game, args.plies)
+        for path in args.transcripts:
+            with open(path) as f:
+                print('%s: %d games' % (path, builder.import_transcripts(f)))
+        for path in args.records:
+            print('%s: %d games' % (path, builder.import_log(path)))
+        if args.self_play:
+            builder.self_play(game.alphabeta_searcher(args.depth, endgame=False), args.self_play)
+            print('self-play: %d games' % args.self_play)
+        if builder.skipped:
+            print('%d bad games skipped' % builder.skipped)
+        print('%s: %d positions' % (args.out, builder.write(args.out, args.min_games)))
+    else:
+        book = OpeningBook(game, args.out)
+        board, player = game.initial_board(), game.BLACK
+        while player is not None:
+            move = book.lookup(player, board)
+            if move is None:
+                break
+            print(game.PLAYERS[player], 'plays', format_move(move))
+            game.make_move(move, player, board)
+            player = game.next_player(board, player)
+        print(game.print_board(board))
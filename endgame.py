@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : endgame.py
+# Description : jeux Othello, résolution exacte des fins de partie sur bitboards
+#               bench: python3 endgame.py [empties] [positions]
+# modification: 2026/10/17
+########################################################################
+
+import sys, time, random
+from bitboard import FULL, MASKS, SQUARES, popcount, legal_moves, flips
+from stability import PARITY_BITS, parity, stable_discs
+from game import SearchTimeout
+
+
+class EndgameSolver:
+    """Perfect play search down to the end of the game, returning the exact disc differential.
+
+    Moves are sorted fastest-first (fewest opponent replies, then most stable edge discs, then odd quadrant
+    parity) while more than PARITY_EMPTIES squares are empty, by quadrant parity only below. The parity of
+    the quadrants is passed down the tree, updated by a xor per move. Above PARITY_EMPTIES, a position
+    where the stable discs of the opponent leave no better score than alpha is cut at once. The last 4
+    empty squares are played without move generation, and the last one is counted directly. Moves after the first one are
+    searched with a null window first, and the bounds found are kept in a table during one solve.
+    node_limit/time_limit bound the search: SearchTimeout is raised when one of them is over, or once the
+    cancel event is set. The searchers only start a solve when likely() expects it to end within its nodes.
+    """
+    PARITY_EMPTIES = 7      #up to this number of empties: parity ordering only
+    SMALL_EMPTIES = 4       #up to this number of empties: special cases without move generation
+    TIME_LIMIT = 10.0       #default seconds per solve
+    TABLE_ENTRIES = 1 << 18 #bounds kept for the positions with more than PARITY_EMPTIES empties
+    CHECK_NODES = 1024      #nodes between two checks of the limits
+    SOLVE_GROWTH = 2.5      #SOLVE_GROWTH ** empties: nodes of a solve, above most of the random positions
+                            #(median 24000 nodes at 12 empties, 120000 at 14, about x2.5 per empty)
+    SOLVE_NODES = 1 << 18   #default nodes of likely(): up to 13 empties, a few seconds on a Pi 4
+
+    def __init__(self, game, time_limit=TIME_LIMIT, node_limit=None):
+        self.game = game
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.table = {}             #(own, opp) -> (lower, upper) bounds of the exact value
+        self.deadline = None
+        self.next_check = 0         #number of nodes of the next check of the limits
+        self.cancel = None          #threading.Event or multiprocessing.Event stopping the solve once set, None: none
+
+    #is a position with empties empty squares likely solved within nodes (SOLVE_NODES if None)?
+    def likely(self, empties, nodes=None):
+        return self.SOLVE_GROWTH ** empties <= (self.SOLVE_NODES if nodes is None else nodes)
+
+    #exact solve of the board with player to move: returns (disc differential for player, best move)
+    def solve(self, player, board, deadline=None):
+        own, opp = self.to_own_opp(player, board)
+        self.nodes = 0
+        self.next_check = 0
+        self.table = {}
+        self.deadline = deadline
+        if self.deadline is None and self.time_limit is not None:
+            self.deadline = time.monotonic() + self.time_limit
+        moves = legal_moves(own, opp)
+        empty = FULL ^ (own | opp)
+        odd = parity(empty)
+        if not moves:
+            return self._search(own, opp, -65, 65, odd), None
+        alpha, best_move = -65, None
+        for move, flipped in self._order(own, opp, moves, popcount(empty), odd):
+            new_own, new_opp = opp ^ flipped, own | move | flipped
+            new_odd = odd ^ PARITY_BITS[move]
+            if best_move is None:
+                val = -self._search(new_own, new_opp, -65, 65, new_odd)
+            else:
+                val = -self._search(new_own, new_opp, -alpha - 1, -alpha, new_odd)
+                if val > alpha:
+                    val = -self._search(new_own, new_opp, -65, -val, new_odd)
+            if val > alpha:
+                alpha, best_move = val, SQUARES[move.bit_length() - 1]
+        return alpha, best_move
+
+    #(player, opponent) bitboards of a list board
+    def to_own_opp(self, player, board):
+        own = opp = 0
+        theirs = self.game.opponent(player)
+        for sq, mask in MASKS.items():
+            if board[sq] == player:
+                own |= mask
+            elif board[sq] == theirs:
+                opp |= mask
+        return own, opp
+
+    #moves as (move bit, flipped discs), most promising first, odd: parity of the quadrants (see stability.parity)
+    def _order(self, own, opp, moves, empties, odd):
+        ordered = []
+        while moves:
+            move = moves & -moves
+            moves ^= move
+            flipped = flips(move, own, opp)
+            in_odd = odd & PARITY_BITS[move]
+            if empties > self.PARITY_EMPTIES:
+                new_own = own | move | flipped
+                replies = popcount(legal_moves(opp ^ flipped, new_own))
+                stable = popcount(new_own & stable_discs(new_own, opp ^ flipped))
+                ordered.append((replies, -stable, -in_odd, move, flipped))
+            else:
+                ordered.append((0, 0, -in_odd, move, flipped))
+        ordered.sort()
+        return [(move, flipped) for replies, stable, in_odd, move, flipped in ordered]
+
+    #fail-soft principal variation search, own to move, odd: parity of the quadrants
+    def _search(self, own, opp, alpha, beta, odd):
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self._check_limits()
+        empty = FULL ^ (own | opp)
+        empties = popcount(empty)
+        if empties <= self.SMALL_EMPTIES:
+            return self._search_small(own, opp, empty, alpha, beta, odd)
+        moves = legal_moves(own, opp)
+        if not moves:
+            if legal_moves(opp, own):
+                return -self._search(opp, own, -beta, -alpha, odd)
+            return popcount(own) - popcount(opp)
+        if empties > self.PARITY_EMPTIES:
+            #stability cutoff: the stable discs of opp are still opp's at the end
+            best_possible = 64 - 2 * popcount(opp & stable_discs(own, opp))
+            if best_possible <= alpha:
+                return best_possible
+            #bounds of the positions already searched
+            key = (own, opp)
+            lower, upper = self.table.get(key, (-64, 64))
+            if lower >= beta:
+                return lower
+            if upper <= alpha:
+                return upper
+            alpha, beta = max(alpha, lower), min(beta, upper)
+            alpha_orig, beta_orig = alpha, beta
+        best = -65
+        for move, flipped in self._order(own, opp, moves, empties, odd):
+            new_own, new_opp = opp ^ flipped, own | move | flipped
+            new_odd = odd ^ PARITY_BITS[move]
+            if best == -65:
+                val = -self._search(new_own, new_opp, -beta, -alpha, new_odd)
+            else:   #null window first: only the principal variation is searched with the full window
+                val = -self._search(new_own, new_opp, -alpha - 1, -alpha, new_odd)
+                if alpha < val < beta:
+                    val = -self._search(new_own, new_opp, -beta, -val, new_odd)
+            if val > best:
+                best = val
+                if val > alpha:
+                    alpha = val
+                    if alpha >= beta:
+                        break
+        if empties > self.PARITY_EMPTIES:
+            if len(self.table) >= self.TABLE_ENTRIES:
+                self.table.clear()
+            if best <= alpha_orig:
+                self.table[key] = (lower, best)
+            elif best >= beta_orig:
+                self.table[key] = (best, upper)
+            else:
+                self.table[key] = (best, best)
+        return best
+
+    #last empty squares: each empty square is tried directly, odd quadrants first
+    def _search_small(self, own, opp, empty, alpha, beta, odd):
+        if empty & (empty - 1) == 0:
+            return self._search_last(own, opp, empty)
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self._check_limits()
+        squares = []
+        x = empty
+        while x:
+            move = x & -x
+            x ^= move
+            if odd & PARITY_BITS[move]:
+                squares.insert(0, move)
+            else:
+                squares.append(move)
+        best = -65
+        for move in squares:
+            flipped = flips(move, own, opp)
+            if flipped:
+                val = -self._search_small(opp ^ flipped, own | move | flipped, empty ^ move, -beta, -alpha,
+                                          odd ^ PARITY_BITS[move])
+                if val > best:
+                    best = val
+                    if val > alpha:
+                        alpha = val
+                        if alpha >= beta:
+                            break
+        if best == -65:     #no move: pass or end of the game
+            if any(flips(move, opp, own) for move in squares):
+                return -self._search_small(opp, own, empty, -beta, -alpha, odd)
+            return popcount(own) - popcount(opp)
+        return best
+
+    #last empty square: final disc differential
+    def _search_last(self, own, opp, move):
+        self.nodes += 1
+        flipped = flips(move, own, opp)
+        if flipped:
+            return popcount(own | move | flipped) - popcount(opp ^ flipped)
+        flipped = flips(move, opp, own)
+        if flipped:
+            return popcount(own ^ flipped) - popcount(opp | move | flipped)
+        return popcount(own) - popcount(opp)
+
+    #SearchTimeout once past the deadline or the node limit, or cancelled, else schedule the next check
+    def _check_limits(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SearchTimeout()
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+        if self.cancel is not None and self.cancel.is_set():
+            raise SearchTimeout()
+        self.next_check = self.nodes + self.CHECK_NODES
+        if self.node_limit is not None:
+            self.next_check = min(self.next_check, self.node_limit + 1)
+
+
+#random position with the given number of empty squares, played from the initial board
+def random_position(game, empties, rnd):
+    while True:
+        board, player = game.initial_board(), game.BLACK
+        while player is not None and game.empty_pieces(board) > empties:
+            game.make_move(rnd.choice(game.legal_moves(player, board)), player, board)
+            player = game.next_player(board, player)
+        if player is not None:
+            return player, board
+
+#solve random positions and report nodes per second
+def bench(empties=14, positions=5, seed=1):
+    from bitboard import BitboardGame
+    game = BitboardGame()
+    solver = EndgameSolver(game, time_limit=None)
+    rnd = random.Random(seed)
+    total_nodes, total_time = 0, 0.0
+    for n in range(positions):
+        player, board = random_position(game, empties, rnd)
+        start = time.perf_counter()
+        score, move = solver.solve(player, board)
+        elapsed = time.perf_counter() - start
+        total_nodes += solver.nodes
+        total_time += elapsed
+        print('%d empties: %s plays %s, score %+d, %d nodes in %.2fs' % (empties, game.PLAYERS[player], move, score, solver.nodes, elapsed))
+    print('total: %d nodes in %.2fs, %.0f nodes/s' % (total_nodes, total_time, total_nodes / max(total_time, 1e-9)))
+
+
+if __name__ == '__main__':
+    bench(*map(int, sys.argv[1:3]))
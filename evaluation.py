@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : evaluation.py
+# Description : jeux Othello, fonction d'évaluation de milieu de partie sur bitboards
+#               (cases pondérées, mobilité, mobilité potentielle, pions frontière, pions stables des bords)
+#               évaluation par lots avec numpy si disponible
+# modification: 2026/10/17
+########################################################################
+
+from bitboard import FULL, NOT_A, NOT_H, SQUARES, BITS, BitboardGame, popcount, legal_moves
+from stability import stability
+try:
+    import numpy as np
+except ImportError:     #numpy is optional: batches are then evaluated one board at a time
+    np = None
+
+#the corners and the squares next to them, as (corner square, (C square, C square, X square))
+CORNER_ZONES = ((11, (12, 21, 22)), (18, (17, 28, 27)), (81, (82, 71, 72)), (88, (87, 78, 77)))
+
+#squares next to the discs of x, in the 8 directions
+def neighbours(x):
+    return (((x << 1) & NOT_A) | ((x >> 1) & NOT_H) | (x << 8) | (x >> 8) |
+            ((x << 9) & NOT_A) | ((x << 7) & NOT_H) | ((x >> 7) & NOT_A) | ((x >> 9) & NOT_H)) & FULL
+
+
+class Evaluator:
+    """Midgame evaluation of a board for player, usable as the evaluate function of the searchers.
+
+    Weighted sum of terms, each one as player's value minus opponent's one:
+      squares   : SQUARE_WEIGHTS of the discs (the weighted_score of Game), the squares next to a taken
+                  corner losing their weight: they no longer give the corner away
+      mobility  : number of legal moves
+      potential : empty squares next to the opponent discs (moves that may come)
+      frontier  : discs next to an empty square, counted against the player
+      stability : edge discs which can't be flipped anymore, looked up in stability.EDGE_STABLE
+    batch(player, boards) scores many boards at once, vectorized with numpy when it is installed.
+    With batched=True, alphabeta and maximizer score all the leaves of a depth 1 node in one call: numpy
+    pays off from a few tens of boards, so it is worth it for wide nodes or bulk analysis, not by default.
+    """
+    WEIGHTS = {'squares': 1, 'mobility': 15, 'potential': 5, 'frontier': 4, 'stability': 20}
+
+    def __init__(self, game, weights=None, batched=False):
+        self.game = game
+        self.bits = game if isinstance(game, BitboardGame) else BitboardGame()
+        self.weights = dict(self.WEIGHTS, **(weights or {}))
+        #ROW_WEIGHTS[r][byte]: sum of the SQUARE_WEIGHTS of row r squares set in byte
+        self.ROW_WEIGHTS = [[sum(game.SQUARE_WEIGHTS[SQUARES[8*r + c]] for c in range(8) if byte >> c & 1)
+                             for byte in range(256)] for r in range(8)]
+        #CORNER_WEIGHTS: (corner bit, ((bit, SQUARE_WEIGHTS) of the squares next to it)) of CORNER_ZONES
+        self.CORNER_WEIGHTS = [(1 << BITS[corner], tuple((1 << BITS[sq], game.SQUARE_WEIGHTS[sq]) for sq in zone))
+                               for corner, zone in CORNER_ZONES]
+        self.limit = game.MAX_VALUE - 1     #final values of the won/lost games stay above the evaluation
+        self.batched = batched and np is not None
+
+    #value for player of board
+    def __call__(self, player, board):
+        own, opp = self.bits.own_opp(player, board)
+        return self.evaluate(own, opp)
+
+    #value for own of (own, opp) bitboards
+    def evaluate(self, own, opp):
+        rows = self.ROW_WEIGHTS
+        squares = 0
+        for r in range(8):
+            squares += rows[r][own >> 8*r & 255] - rows[r][opp >> 8*r & 255]
+        squares -= self.taken_corners(own, opp)
+        empty = FULL ^ (own | opp)
+        near_empty = neighbours(empty)
+        w = self.weights
+        value = (w['squares'] * squares
+                 + w['mobility'] * (popcount(legal_moves(own, opp)) - popcount(legal_moves(opp, own)))
+                 + w['potential'] * (popcount(empty & neighbours(opp)) - popcount(empty & neighbours(own)))
+                 - w['frontier'] * (popcount(own & near_empty) - popcount(opp & near_empty))
+                 + w['stability'] * stability(own, opp))
+        return max(-self.limit, min(self.limit, value))
+
+    #SQUARE_WEIGHTS of the discs of own next to a taken corner, minus the ones of opp
+    def taken_corners(self, own, opp):
+        total = 0
+        taken = own | opp
+        for corner, zone in self.CORNER_WEIGHTS:
+            if taken & corner:
+                for mask, weight in zone:
+                    if own & mask:
+                        total += weight
+                    elif opp & mask:
+                        total -= weight
+        return total
+
+    #values for player of the boards
+    def batch(self, player, boards):
+        if np is None or len(boards) < 2:
+            return [self(player, board) for board in boards]
+        own_opp = [self.bits.own_opp(player, board) for board in boards]
+        own = np.array([o for o, p in own_opp], dtype=np.uint64)
+        opp = np.array([p for o, p in own_opp], dtype=np.uint64)
+        return self._batch(own, opp, own_opp).tolist()
+
+    def _batch(self, own, opp, own_opp):
+        w = self.weights
+        empty = ~(own | opp)
+        near_empty = _np_neighbours(empty)
+        value = (w['squares'] * (self._np_squares(own) - self._np_squares(opp))
+                 + w['mobility'] * (_np_popcount(_np_legal_moves(own, opp)) - _np_popcount(_np_legal_moves(opp, own)))
+                 + w['potential'] * (_np_popcount(empty & _np_neighbours(opp)) - _np_popcount(empty & _np_neighbours(own)))
+                 - w['frontier'] * (_np_popcount(own & near_empty) - _np_popcount(opp & near_empty)))
+        #table lookups of the edges and taken corners: kept per board
+        value += np.array([w['stability'] * stability(o, p) - w['squares'] * self.taken_corners(o, p) for o, p in own_opp],
+                          dtype=np.int64)
+        return np.clip(value, -self.limit, self.limit)
+
+    def _np_squares(self, x):
+        if not hasattr(self, '_np_rows'):
+            self._np_rows = np.array(self.ROW_WEIGHTS, dtype=np.int64)
+        rows = x.astype('<u8').view(np.uint8).reshape(-1, 8)     #byte r is row r
+        return self._np_rows[np.arange(8), rows].sum(axis=1)
+
+
+if np is not None:
+    _U = np.uint64
+    _FULL, _NOT_A, _NOT_H = _U(FULL), _U(NOT_A), _U(NOT_H)
+    _POPCOUNT8 = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+    _LEFT_SHIFTS  = ((_U(1), _NOT_A), (_U(8), _FULL), (_U(9), _NOT_A), (_U(7), _NOT_H))
+    _RIGHT_SHIFTS = ((_U(1), _NOT_H), (_U(8), _FULL), (_U(9), _NOT_H), (_U(7), _NOT_A))
+
+    def _np_popcount(x):
+        return _POPCOUNT8[x.astype('<u8').view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+    def _np_neighbours(x):
+        result = np.zeros_like(x)
+        for shift, mask in _LEFT_SHIFTS:
+            result |= (x << shift) & mask
+        for shift, mask in _RIGHT_SHIFTS:
+            result |= (x >> shift) & mask
+        return result
+
+    #bitboard.legal_moves over arrays of boards
+    def _np_legal_moves(own, opp):
+        empty = ~(own | opp)
+        moves = np.zeros_like(own)
+        for shift, mask in _LEFT_SHIFTS:
+            w = opp & mask
+            t = w & (own << shift)
+            for step in range(5):
+                t |= w & (t << shift)
+            moves |= (t << shift) & mask
+        for shift, mask in _RIGHT_SHIFTS:
+            w = opp & mask
+            t = w & (own >> shift)
+            for step in range(5):
+                t |= w & (t >> shift)
+            moves |= (t >> shift) & mask
+        return moves & empty
@@ -7,7 +7,27 @@
 # modification: 2019/12/10
 ########################################################################
 
-import time, random
+import time, random, threading
+from stats import move_stats, search_stats
+from transposition import TranspositionTable
+from search import Search
+
+#precomputed tables of the 10x10 board layout (see Game)
+DIRECTIONS = (-10, -9, 1, 11, 10, 9, -1, -11)
+VALID_SQUARES = [i for i in range(11, 89) if 1 <= (i % 10) <= 8]
+def _ray(square, direction):
+    ray = []
+    square += direction
+    while square in VALID_SQUARES:
+        ray.append(square)
+        square += direction
+    return tuple(ray)
+#RAYS[sq]: squares met from sq in each direction up to the edge, only the rays long enough for a bracket (2 squares)
+RAYS = [tuple(ray for ray in (_ray(sq, d) for d in DIRECTIONS) if len(ray) >= 2) if sq in VALID_SQUARES else ()
+        for sq in range(100)]
+#NEIGHBORS[sq]: valid squares next to sq
+NEIGHBORS = [tuple(sq + d for d in DIRECTIONS if sq + d in VALID_SQUARES) if sq in VALID_SQUARES else ()
+             for sq in range(100)]
 
 class Game:
     """We represent the board as a 100-element list, which includes each square on the board as well as the outside edge.
@@ -33,7 +53,7 @@ class Game:
         self.UP, self.DOWN, self.LEFT, self.RIGHT = -10, 10, -1, 1
         self.UP_RIGHT, self.DOWN_RIGHT, self.DOWN_LEFT, self.UP_LEFT = -9, 11, 9, -11
         self.DIRECTIONS = (self.UP, self.UP_RIGHT, self.RIGHT, self.DOWN_RIGHT, self.DOWN, self.DOWN_LEFT, self.LEFT, self.UP_LEFT)
-        self.valid_squares = self.squares()     #list of valid squares
+        self.valid_squares = list(VALID_SQUARES)    #list of valid squares
         self.SQUARE_WEIGHTS = [                 #relative worth of each square on the board 
             0,   0,   0,   0,   0,   0,   0,   0,   0,   0,
             0, 120, -20,  20,   5,   5,  20, -20, 120,   0,
@@ -53,7 +73,7 @@ class Game:
 
     #List all the valid squares on the board.
     def squares(self):
-        return [i for i in range(11, 89) if 1 <= (i % 10) <= 8]
+        return list(VALID_SQUARES)
     
     #Create a new board with the initial black and white positions filled.
     def initial_board(self):
@@ -88,7 +108,7 @@ class Game:
 
     #Get player's opponent piece
     def opponent(self, player):
-        return self.BLACK if player is self.WHITE else self.WHITE
+        return self.BLACK if player == self.WHITE else self.WHITE
 
     #Find a square that forms a bracket with square for player in the given direction. Returns None if no such square exists.
     def find_bracket(self, square, player, board, direction):
@@ -102,16 +122,60 @@ class Game:
 
     #Is this a legal move for the player?
     def is_legal(self,move, player, board):
-        hasbracket = lambda direction: self.find_bracket(move, player, board, direction)
-        return board[move] == self.EMPTY and any(map(hasbracket, self.DIRECTIONS))
+        return board[move] == self.EMPTY and self.has_bracket(move, player, self.opponent(player), board)
+
+    #Is there a bracket for player (opp his opponent) from empty square move? Walks the precomputed rays.
+    def has_bracket(self, move, player, opp, board):
+        for ray in RAYS[move]:
+            if board[ray[0]] == opp:
+                for sq in ray[1:]:
+                    piece = board[sq]
+                    if piece != opp:
+                        if piece == player:
+                            return True
+                        break
+        return False
+
+    #Empty squares next to opp pieces, the only ones where player may move, in increasing order.
+    def frontier(self, opp, board):
+        empty = self.EMPTY
+        squares = set()
+        for sq in VALID_SQUARES:
+            if board[sq] == opp:
+                for n in NEIGHBORS[sq]:
+                    if board[n] == empty:
+                        squares.add(n)
+        return sorted(squares)
 
     #Update the board to reflect the move by the specified player.
     def make_move(self, move, player, board):
-        board[move] = player
-        for d in self.DIRECTIONS:
-            self.make_flips(move, player, board, d)
+        self.make_move_undo(move, player, board)
         return board
 
+    #Update the board in place and return the undo record of the move: the list of flipped squares.
+    def make_move_undo(self, move, player, board):
+        opp = self.opponent(player)
+        board[move] = player
+        flipped = []
+        for ray in RAYS[move]:
+            if board[ray[0]] == opp:
+                for i, sq in enumerate(ray):
+                    piece = board[sq]
+                    if piece != opp:
+                        if piece == player:
+                            for sq in ray[:i]:
+                                board[sq] = player
+                            flipped.extend(ray[:i])
+                        break
+        return flipped
+
+    #Take back a move played by make_move_undo, given its undo record.
+    def unmake_move(self, move, player, board, flipped):
+        opp = self.opponent(player)
+        for square in flipped:
+            board[square] = opp
+        board[move] = self.EMPTY
+
     #Flip pieces in the given direction as a result of the move by player.
     def make_flips(self, move, player, board, direction):
         bracket = self.find_bracket(move, player, board, direction)
@@ -124,11 +188,21 @@ class Game:
 
     #Get a list of all legal moves for player.
     def legal_moves(self, player, board):
-        return [sq for sq in self.valid_squares if self.is_legal(sq, player, board)]
+        opp = self.opponent(player)
+        return [sq for sq in self.frontier(opp, board) if self.has_bracket(sq, player, opp, board)]
 
     #Can player make any moves?
     def any_legal_move(self, player, board):
-        return any(self.is_legal(sq, player, board) for sq in self.valid_squares)
+        opp = self.opponent(player)
+        return any(self.has_bracket(sq, player, opp, board) for sq in self.frontier(opp, board))
+
+    #Compact position.Position of board with player to move, and back to a board
+    def position(self, player, board):
+        from position import Position
+        return Position.from_board(player, board)
+
+    def board_of(self, position):
+        return position.to_board()
 
     #Play a game of Othello and return the final board and score
     #Each round consists of:
@@ -198,17 +272,36 @@ class Game:
         
 
     #strategy based on maximazing scores
-    #evaluate function is either "weighted_score" or "final_value", depends on how many empty left pieces
+    #evaluate function is either "weighted_score" (or the given midgame evaluate) or "final_value", depends on how many empty left pieces
+    #book: opening book.OpeningBook looked up first, if given
+    #strategy.stats: statistics of the last move (see stats.move_stats)
     #----------------------------------------------------------------------------------------------------
-    def maximizer(self):
+    def maximizer(self, evaluate=None, book=None):
+        midgame = evaluate or self.weighted_score
         def strategy(player, board):
+            start = time.monotonic()
+            move = book.lookup(player, board) if book is not None else None
+            if move is not None:
+                strategy.stats = move_stats('book', time.monotonic() - start)
+                return move
             if self.empty_pieces(board) > self.EMPTY_THRESOLD:
-                evaluate = self.weighted_score
+                evaluate = midgame
             else:
                 evaluate = self.final_value
-            def score_move(move):
-                return evaluate(player, self.make_move(move, player, list(board)))
-            return max(self.legal_moves(player, board), key=score_move)
+            moves = self.legal_moves(player, board)
+            if getattr(evaluate, 'batched', False):
+                values = evaluate.batch(player, [self.make_move(move, player, list(board)) for move in moves])
+                move = max(zip(moves, values), key=lambda move_value: move_value[1])[0]
+            else:
+                def score_move(move):
+                    flipped = self.make_move_undo(move, player, board)
+                    value = evaluate(player, board)
+                    self.unmake_move(move, player, board, flipped)
+                    return value
+                move = max(moves, key=score_move)
+            strategy.stats = move_stats('maximizer', time.monotonic() - start, 1, len(moves), len(moves))
+            return move
+        strategy.stats = None
         return strategy
 
     #score based on square weigths
@@ -232,34 +325,157 @@ class Game:
         return diff
 
     #min-max alpha-beta recursive research
+    #moves are played in place on board with make_move_undo and taken back with unmake_move: board is unchanged on return
+    #search: optional Search state holding the transposition table (exact/lower/upper values and best moves of the
+    #        positions searched), the deadline, node limit and cancel flag (SearchTimeout is raised when one is over,
+    #        see Search.check_limits), move ordering, counters,
+    #        and the hash key and weighted score updated incrementally from the flips
     #----------------------------------------------------------------
-    def alphabeta(self, player, board, alpha, beta, depth, evaluate):
+    def alphabeta(self, player, board, alpha, beta, depth, evaluate, search=None):
+        if search is not None:
+            search.nodes += 1
+            if search.nodes >= search.next_check:
+                search.check_limits()
+            if depth == 0:
+                search.leaves += 1
+                if search.weighted is not None:
+                    return (search.weighted if player == self.BLACK else -search.weighted), None
         if depth == 0:
             return evaluate(player, board), None
-        def value(board, alpha, beta):
-            return -self.alphabeta(self.opponent(player), board, -beta, -alpha, depth-1, evaluate)[0]
+        hash_move = None
+        table = None
+        if search is not None:
+            table = search.table
+        if table is not None:
+            key = search.key
+            entry = table.probe(key)
+            if entry is not None:
+                search.hits += 1
+                hash_move = entry[4]
+                if entry[1] >= depth:
+                    flag, val = entry[2], entry[3]
+                    if flag == table.EXACT or (flag == table.LOWER and val >= beta) or (flag == table.UPPER and val <= alpha):
+                        return val, hash_move
+            alpha_orig = alpha
+        opp = self.opponent(player)
         moves = self.legal_moves(player, board)
         if not moves:
-            if not self.any_legal_move(self.opponent(player), board):
+            if not self.any_legal_move(opp, board):
                 return self.final_value(player, board), None
-            return value(board, alpha, beta), None
-    
+            if search is None:
+                return -self.alphabeta(opp, board, -beta, -alpha, depth-1, evaluate)[0], None
+            search.pass_move()
+            val = -self.alphabeta(opp, board, -beta, -alpha, depth-1, evaluate, search)[0]
+            search.pass_move(undo=True)
+            return val, None
+        if search is not None:
+            search.order(moves, hash_move)
+
         best_move = moves[0]
+        if depth == 1 and getattr(evaluate, 'batched', False):    #all the leaves scored in one call
+            values = evaluate.batch(opp, [self.make_move(move, player, list(board)) for move in moves])
+            if search is not None:
+                search.nodes += len(moves)
+                search.leaves += len(moves)
+            for move, val in zip(moves, values):
+                if -val > alpha:
+                    alpha = -val
+                    best_move = move
+            if alpha >= beta and search is not None:
+                search.cutoff(best_move, depth)
+            moves = ()
         for move in moves:
             if alpha >= beta:
                 break
-            val = value(self.make_move(move, player, list(board)), alpha, beta)
+            if search is None:
+                flipped = self.make_move_undo(move, player, board)
+                val = -self.alphabeta(opp, board, -beta, -alpha, depth-1, evaluate)[0]
+                self.unmake_move(move, player, board, flipped)
+            else:
+                undo = search.make_move(move, player, board)
+                val = -self.alphabeta(opp, board, -beta, -alpha, depth-1, evaluate, search)[0]
+                search.unmake_move(move, player, board, undo)
             if val > alpha:
                 alpha = val
                 best_move = move
+                if alpha >= beta and search is not None:
+                    search.cutoff(move, depth)
+        if table is not None:
+            if alpha <= alpha_orig:
+                flag = table.UPPER
+            elif alpha >= beta:
+                flag = table.LOWER
+            else:
+                flag = table.EXACT
+            table.store(key, depth, flag, alpha, best_move)
         return alpha, best_move
 
-    def alphabeta_searcher(self, depth):
+    #depth: search depth, or maximum depth when time_budget is given
+    #table: TranspositionTable kept alive across the successive moves, a new one is created if None.
+    #       Size it with TranspositionTable(game, entries=...) or TranspositionTable(game, mb=...)
+    #time_budget: seconds per move. The search deepens one ply at a time, each iteration trying first the
+    #       best moves stored in the table by the previous one, and returns the best move of the last completed depth.
+    #ordering: False to try the moves in the legal_moves order, to measure the pruning gain on strategy.search counters
+    #endgame: below EMPTY_THRESOLD empties, the position is solved to the end by an EndgameSolver first when it is
+    #       likely to end (see EndgameSolver.likely), within its time limit (half the time_budget if given);
+    #       alphabeta on final_value is used otherwise or if it is over.
+    #evaluate: midgame evaluate(player, board) function, weighted_score if None (see evaluation.Evaluator)
+    #book: opening book.OpeningBook looked up first, if given
+    #strategy.stats: statistics of the last move (see stats.move_stats), strategy.search: its Search state,
+    #strategy.cancel: event stopping the running search with SearchTimeout once set (see ponder.Ponderer)
+    def alphabeta_searcher(self, depth=None, table=None, time_budget=None, ordering=True, endgame=True, evaluate=None, book=None):
+        from endgame import EndgameSolver
+        if depth is None and time_budget is None:
+            raise ValueError('alphabeta_searcher needs a depth or a time_budget')
+        if table is None:
+            table = TranspositionTable(self)
+        search = Search(self, table, ordering)
+        solver = EndgameSolver(self) if endgame else None
+        search.cancel = threading.Event()
+        if solver is not None:
+            solver.cancel = search.cancel
+        midgame = evaluate or self.weighted_score
         def strategy(player, board):
+            start = time.monotonic()
+            move = book.lookup(player, board) if book is not None else None
+            if move is not None:
+                strategy.stats = move_stats('book', time.monotonic() - start)
+                return move
+            board = list(board)     #the search plays in place, and a timeout may leave moves on the board
             if self.empty_pieces(board) > self.EMPTY_THRESOLD:
-                evaluate = self.weighted_score
+                evaluate = midgame
             else:
                 evaluate = self.final_value
-            return self.alphabeta(player, board, self.MIN_VALUE, self.MAX_VALUE, depth, evaluate)[1]
+                if solver is not None and solver.likely(self.empty_pieces(board)):
+                    try:
+                        move = solver.solve(player, board, None if time_budget is None else start + time_budget / 2)[1]
+                        strategy.stats = move_stats('endgame', time.monotonic() - start, self.empty_pieces(board), solver.nodes)
+                        return move
+                    except SearchTimeout:
+                        pass
+            table.use_evaluate(evaluate)
+            if time_budget is None:
+                search.new_search(player, board, evaluate)
+                move = self.alphabeta(player, board, self.MIN_VALUE, self.MAX_VALUE, depth, evaluate, search)[1]
+                strategy.stats = search_stats(search, depth, time.monotonic() - start)
+                return move
+            search.new_search(player, board, evaluate, start + time_budget)
+            best_move, reached = self.legal_moves(player, board)[0], 0
+            for d in range(1, (depth or self.empty_pieces(board)) + 1):
+                try:
+                    best_move = self.alphabeta(player, board, self.MIN_VALUE, self.MAX_VALUE, d, evaluate, search)[1]
+                    reached = d
+                except SearchTimeout:
+                    break
+            strategy.stats = search_stats(search, reached, time.monotonic() - start)
+            return best_move
+        strategy.search = search    #counters of the last move
+        strategy.solver = solver
+        strategy.cancel = search.cancel
+        strategy.stats = None
         return strategy
 
+
+#raised by Game.alphabeta when the search deadline is over
+class SearchTimeout(Exception):
+    pass
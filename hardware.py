@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : hardware.py
+# Description : jeux Othello, accès au matériel (matrice leds, boutons, leds)
+#               PiBackend: Raspberry Pi (RPi.GPIO, matrice HT16K33 en I2C)
+#               SimBackend: simulation en mémoire, boutons scriptés, journal des images affichées
+# modification: 2026/10/17
+########################################################################
+
+import time
+
+#HT16K33 bicolor matrix on the I2C bus, written by show() only
+def ht16k33():
+    import board, busio
+    from adafruit_ht16k33 import matrix
+    return matrix.Matrix8x8x2(busio.I2C(board.SCL, board.SDA), auto_write=False)
+
+
+class PiBackend:
+    """Hardware of the Raspberry Pi: the modules are imported here, so the others can be imported anywhere."""
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+
+    #device of the led matrix: pixels set by device[row, col] = color, sent by device.show()
+    def matrix(self):
+        return ht16k33()
+
+    #pin as an output
+    def setup_output(self, pin):
+        self.GPIO.setup(pin, self.GPIO.OUT)
+
+    #set output pin high (True) or low (False)
+    def output(self, pin, high):
+        self.GPIO.output(pin, self.GPIO.HIGH if high else self.GPIO.LOW)
+
+    #push button name wired on pin (pull up): callback(pin) is called when it is pressed
+    def add_button(self, name, pin, callback, bouncetime):
+        self.GPIO.setup(pin, self.GPIO.IN, pull_up_down=self.GPIO.PUD_UP)        # mode INPUT, pull_up=high
+        self.GPIO.add_event_detect(pin, self.GPIO.FALLING, callback=callback, bouncetime=bouncetime)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    #switch off the Raspberry
+    def halt(self):
+        import os
+        os.system('sudo halt')
+
+
+class SimulatedMatrix:
+    """Led matrix in memory: each frame sent by show() is logged with the simulated time."""
+    def __init__(self, backend):
+        self.backend = backend
+        self.pixels = [0] * 64
+        self.frames = []    #(time, 64 colors)
+
+    def __setitem__(self, row_col, color):
+        row, col = row_col
+        self.pixels[8*row + col] = color
+
+    def fill(self, color):
+        self.pixels = [color] * 64
+
+    def show(self):
+        self.frames.append((self.backend.clock, tuple(self.pixels)))
+
+
+class SimBackend:
+    """Simulated hardware, to run Application.loop anywhere (profiling, load tests).
+
+    script: button presses as (delay, name) pairs, name being a button name given to add_button ('OFF',
+    'CHX', 'VAL'), the delay in simulated seconds after the previous press. Time is simulated: sleep()
+    moves the clock and triggers the presses which are due, in the calling thread. speed: simulated
+    seconds per real second, None to not sleep at all. Leds outputs are logged, halt() only records it.
+    End the script with 'OFF' to end Application.loop.
+    """
+    def __init__(self, script=(), speed=None):
+        self.clock = 0.0
+        self.speed = speed
+        self.events = []
+        due = 0.0
+        for delay, name in script:
+            due += delay
+            self.events.append((due, name))
+        self.buttons = {}       #name -> (pin, callback)
+        self.outputs = {}       #pin -> level
+        self.output_log = []    #(time, pin, level)
+        self.device = SimulatedMatrix(self)
+        self.halted = False
+
+    def matrix(self):
+        return self.device
+
+    def setup_output(self, pin):
+        self.outputs[pin] = False
+
+    def output(self, pin, high):
+        if self.outputs.get(pin) != high:
+            self.output_log.append((self.clock, pin, high))
+        self.outputs[pin] = high
+
+    def add_button(self, name, pin, callback, bouncetime):
+        self.buttons[name] = (pin, callback)
+
+    #press button name now
+    def press(self, name):
+        pin, callback = self.buttons[name]
+        callback(pin)
+
+    def sleep(self, seconds):
+        if self.speed is not None:
+            time.sleep(seconds / self.speed)
+        self.clock += seconds
+        while self.events and self.events[0][0] <= self.clock:
+            due, name = self.events.pop(0)
+            self.press(name)
+
+    def halt(self):
+        self.halted = True
+
+    @property
+    def frames(self):
+        return self.device.frames
@@ -4,59 +4,98 @@
 # Description : jeux Othello sur une matrice leds bicolor 8*8 Adafruit
 # auther      : papsdroid.fr
 # modification: 2019/12/18
+#               2026/10/17: framebuffer, only the changed frames are sent, in one I2C write
+#                           device given by a hardware backend (see hardware.py)
 ########################################################################
 
-import time, board, busio
-from adafruit_ht16k33 import matrix
+import time
+from contextlib import contextmanager
+import hardware
 
 class ledMatrix:
-    def __init__(self):
-        self.i2c = busio.I2C(board.SCL, board.SDA)  #i2c interface
-        self.bicolor = matrix.Matrix8x8x2(self.i2c) #Led bargraph class
+    #device: matrix of a hardware backend, the HT16K33 on I2C if None
+    #sleep: sleep function of the animations
+    def __init__(self, device=None, sleep=time.sleep):
+        self.bicolor = device if device is not None else hardware.ht16k33() #Led bargraph class, written by show()
+        self.sleep = sleep
         self.OFF = 0
         self.GREEN = 1
         self.RED = 2
         self.YELLOW = 3
         self.col_max = 8
         self.row_max = 8
+        self.frame = [self.OFF] * (self.row_max * self.col_max)    #shadow buffer: color of pixel[row, col] at 8*row + col
+        self.shown = [None] * (self.row_max * self.col_max)        #frame last sent to the matrix (None: unknown)
+        self.batching = 0   #> 0 inside batch(): show() is delayed to its end
+        self.writes = 0     #number of frames sent
+
+    #send the frame to the matrix in one I2C write, if it changed since the last one
+    def show(self):
+        changed = [k for k, color in enumerate(self.frame) if color != self.shown[k]]
+        if not changed:
+            return
+        for k in changed:
+            self.bicolor[k // self.col_max, k % self.col_max] = self.frame[k]    #buffer of the driver only, no I2C
+        self.bicolor.show()
+        self.shown[:] = self.frame
+        self.writes += 1
+
+    #group drawings into one frame: with plateau.batch(): ...
+    @contextmanager
+    def batch(self):
+        self.batching += 1
+        try:
+            yield self
+        finally:
+            self.batching -= 1
+            if self.batching == 0:
+                self.show()
+
+    def _changed(self):
+        if self.batching == 0:
+            self.show()
 
     #turn off all the leds
     def off(self):
-        self.bicolor.fill(self.OFF)
+        self.fill(self.OFF)
 
     #fill with color
     def fill(self, color):
-        self.bicolor.fill(color)
+        self.frame[:] = [color] * len(self.frame)
+        self._changed()
                 
     #set pixel[row, col] with color
     def set_led(self,row, col, color):
-        self.bicolor[row, col] = color
+        self.frame[self.col_max*row + col] = color
+        self._changed()
 
     #set pixel from othello board[lc] range
     def set_led_lc(self, lc, color):
-        self.bicolor[lc//10-1, lc%10-1] = color
-        #self.bicolor[8-lc%10, lc//10-1] = color #45° rotation on the left
+        self.set_led(lc//10-1, lc%10-1, color)
+        #self.set_led(8-lc%10, lc//10-1, color) #45° rotation on the left
 
     #draw rectangle
     def draw_rec(self, lc0, lc1, color):
-        for n in range( lc1%10 - lc0%10 + 1):
-            self.set_led_lc(lc0+n, color)       #top line
-            self.set_led_lc(lc1-n, color)       #bottom line
-        for n in range( lc1//10 - lc0//10 - 1):
-            self.set_led_lc(lc0+10*n+10, color) #left line
-            self.set_led_lc(lc1-10*n-10, color) #rigth line
+        with self.batch():
+            for n in range( lc1%10 - lc0%10 + 1):
+                self.set_led_lc(lc0+n, color)       #top line
+                self.set_led_lc(lc1-n, color)       #bottom line
+            for n in range( lc1//10 - lc0//10 - 1):
+                self.set_led_lc(lc0+10*n+10, color) #left line
+                self.set_led_lc(lc1-10*n-10, color) #rigth line
 
     #animation rectangle growth
     def anim_rect_growth(self, color):
-        self.off()
-        self.set_led_lc(11, self.RED)       #left  up pixel
-        self.set_led_lc(18, self.YELLOW)    #right up pixel
-        self.set_led_lc(88, self.RED)       #right bottom pixel
-        self.set_led_lc(81, self.YELLOW)    #left  bottom pixel
+        with self.batch():
+            self.off()
+            self.set_led_lc(11, self.RED)       #left  up pixel
+            self.set_led_lc(18, self.YELLOW)    #right up pixel
+            self.set_led_lc(88, self.RED)       #right bottom pixel
+            self.set_led_lc(81, self.YELLOW)    #left  bottom pixel
         lc0, lc1 = 44,55        # small square in the center
         for n in range(self.col_max//2):
             self.draw_rec(lc0-11*n,lc1+11*n,color)  #draw green rect
-            time.sleep(0.05)
+            self.sleep(0.05)
             self.draw_rec(lc0-11*n,lc1+11*n,self.OFF)    #erase the rect
 
             
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : levels.py
+# Description : jeux Othello, niveaux de difficulté définis par un budget de noeuds et/ou de temps
+#               sur un moteur de recherche partagé, avec une part de hasard optionnelle
+#               calibrage: python3 levels.py
+# modification: 2026/10/17
+########################################################################
+
+import time, random, threading
+from transposition import TranspositionTable
+from search import Search
+from endgame import EndgameSolver, random_position
+from evaluation import Evaluator
+from game import SearchTimeout
+from stats import move_stats, search_stats
+
+
+class Level:
+    """Difficulty level: budget of a move and share of random moves.
+
+    nodes: nodes searched per move, the same on any hardware, None: no limit
+    seconds: time limit of a move, None: no limit (see LevelEngine.budget for the one of a nodes budget)
+    randomness: probability to play a random legal move instead of the searched one
+    book: True to play the opening book moves
+    """
+    def __init__(self, name, nodes=None, seconds=None, randomness=0.0, book=True):
+        self.name = name
+        self.nodes = nodes
+        self.seconds = seconds
+        self.randomness = randomness
+        self.book = book
+
+    def __repr__(self):
+        return 'Level(%r, nodes=%r, seconds=%r, randomness=%r)' % (self.name, self.nodes, self.seconds, self.randomness)
+
+
+#levels of piOthello and server.py, weakest first
+LEVELS = [Level('IA0', randomness=1.0, book=False),            #random play
+          Level('IA1', nodes=100),                             #about 2 plies
+          Level('IA2', nodes=10000),                           #about 5 plies
+          Level('IA3', nodes=50000, seconds=20.0)]             #about 7 plies
+
+
+class LevelEngine:
+    """One search engine (Search with its transposition table, EndgameSolver) playing every level.
+
+    A move is searched by iterative deepening until the node budget of the level is spent, the move of
+    the last completed depth being played: with a nodes budget, a level reaches the same depths and
+    plays the same moves on a Pi 3 or a Pi 4, only slower. Depth 1 is always completed. Positions are
+    scored by evaluate, an evaluation.Evaluator by default, and by final_value up to EMPTY_THRESOLD empties,
+    where the endgame solver tries first with half the budget when it is likely enough (see EndgameSolver.likely),
+    alphabeta getting what is left. calibrate() measures the nodes per second of the
+    hardware, from which a time cap of each nodes budget is derived (see budget), so that a move can't
+    last much longer than expected whatever the position, without cutting the searches of a slow Pi.
+    With a parallel.ParallelSearcher, each depth is searched over its worker processes, which look evaluate
+    up by name (a Game method, or "evaluator" for the default Evaluator, see parallel._search_move). The budget
+    counts the nodes of all the workers (the root split makes a depth cost more nodes than in one process):
+    a depth is only started when the nodes it is expected to take, those of the last depth times their
+    growth, fit in what is left.
+    Searches are serialized by a lock: the engine can be shared by threads.
+    """
+    SAFETY = 4.0        #time cap of a nodes budget: SAFETY times its expected time,
+    MIN_SECONDS = 0.5   #but at least MIN_SECONDS
+
+    def __init__(self, game, levels=LEVELS, book=None, table=None, seed=None, parallel=None, evaluate=None):
+        self.game = game
+        self.levels = {level.name: level for level in levels}
+        self.book = book
+        self.evaluate = evaluate or Evaluator(game)     #midgame evaluate(player, board) function
+        self.parallel = parallel    #ParallelSearcher of the searches, None: searched in this process
+        self.search = Search(game, table if table is not None else TranspositionTable(game))
+        self.solver = EndgameSolver(game, time_limit=None)
+        self.nps = None         #nodes per second measured by calibrate(), None: not calibrated
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        #stops the running search once set (see ponder.Ponderer)
+        self.cancel = parallel.cancel if parallel is not None else threading.Event()
+        self.search.cancel = self.solver.cancel = self.cancel
+
+    #measure the nodes per second of alphabeta on midgame positions for about seconds, returns the engine
+    def calibrate(self, seconds=0.5):
+        game = self.game
+        rnd = random.Random(1)
+        search = Search(game, TranspositionTable(game, entries=1 << 14))
+        nodes, start = 0, time.monotonic()
+        while time.monotonic() - start < seconds:
+            player, board = random_position(game, 40, rnd)
+            search.new_search(player, board, self.evaluate, start + seconds)
+            try:
+                for depth in range(1, 9):
+                    game.alphabeta(player, board, game.MIN_VALUE, game.MAX_VALUE, depth, self.evaluate, search)
+            except SearchTimeout:
+                pass
+            nodes += search.nodes
+        self.nps = nodes / (time.monotonic() - start)
+        return self
+
+    #(node limit, seconds) of a move of level: a nodes budget is also capped at SAFETY times its expected time
+    def budget(self, level):
+        seconds = level.seconds
+        if level.nodes is not None and self.nps:
+            cap = max(self.MIN_SECONDS, self.SAFETY * level.nodes / self.nps)
+            seconds = cap if seconds is None else min(seconds, cap)
+        return level.nodes, seconds
+
+    #(move, stats) of player on board within node_limit nodes and seconds
+    def search_move(self, player, board, node_limit=None, seconds=None):
+        game, search = self.game, self.search
+        start = time.monotonic()
+        deadline = None if seconds is None else start + seconds
+        board = list(board)     #the search plays in place, and a timeout may leave moves on the board
+        empties = game.empty_pieces(board)
+        if empties <= game.EMPTY_THRESOLD and (node_limit is None or self.solver.likely(empties, node_limit // 2)):
+            self.solver.node_limit = None if node_limit is None else node_limit // 2
+            try:
+                move = self.solver.solve(player, board, deadline)[1]
+                return move, move_stats('endgame', time.monotonic() - start, empties, self.solver.nodes)
+            except SearchTimeout:   #harder than expected: the rest goes to alphabeta
+                if node_limit is not None:
+                    node_limit = max(0, node_limit - self.solver.nodes)
+        evaluate = self.evaluate if empties > game.EMPTY_THRESOLD else game.final_value
+        if self.parallel is not None:
+            name = getattr(evaluate, '__name__', 'evaluator')
+            return self._search_parallel(player, board, empties, name, node_limit, deadline, start)
+        search.table.use_evaluate(evaluate)
+        search.new_search(player, board, evaluate, deadline)
+        best_move, reached = game.legal_moves(player, board)[0], 0
+        for depth in range(1, empties + 1):
+            search.limit_nodes(node_limit if depth > 1 else None)   #depth 1 always completed
+            try:
+                best_move = game.alphabeta(player, board, game.MIN_VALUE, game.MAX_VALUE, depth, evaluate, search)[1]
+                reached = depth
+            except SearchTimeout:
+                break
+        return best_move, search_stats(search, reached, time.monotonic() - start)
+
+    #search_move on the worker processes, evaluating with the function evaluate_name
+    def _search_parallel(self, player, board, empties, evaluate_name, node_limit, deadline, start):
+        best_move, reached = self.game.legal_moves(player, board)[0], 0
+        totals, last, growth = [0, 0, 0, 0], 0, None
+        for depth in range(1, empties + 1):
+            left = None if node_limit is None or depth == 1 else node_limit - totals[0]  #depth 1 always completed
+            if left is not None and growth is not None and last * growth > left:
+                break
+            try:
+                best_move = self.parallel.alphabeta(player, board, depth, evaluate_name, deadline, left)[1]
+                reached = depth
+            except SearchTimeout:
+                break
+            counters = self.parallel.counters
+            totals = [t + n for t, n in zip(totals, counters)]
+            if last:
+                growth = counters[0] / last
+            last = counters[0]
+        return best_move, move_stats('search', time.monotonic() - start, reached, *totals)
+
+    #strategy(player, board) of the level name, strategy.stats being the statistics of its last move
+    def strategy(self, name):
+        level = self.levels[name]
+        def strategy(player, board):
+            start = time.monotonic()
+            if self.random.random() < level.randomness:
+                strategy.stats = move_stats('random', 0)
+                return self.random.choice(self.game.legal_moves(player, board))
+            move = self.book.lookup(player, board) if level.book and self.book is not None else None
+            if move is not None:
+                strategy.stats = move_stats('book', time.monotonic() - start)
+                return move
+            with self.lock:
+                move, strategy.stats = self.search_move(player, board, *self.budget(level))
+            return move
+        strategy.level = level
+        strategy.cancel = self.cancel
+        strategy.stats = None
+        return strategy
+
+
+if __name__ == '__main__':
+    from bitboard import BitboardGame
+    engine = LevelEngine(BitboardGame()).calibrate(2.0)
+    print('%.0f nodes/s' % engine.nps)
+    for level in LEVELS:
+        nodes, seconds = engine.budget(level)
+        print('%s: %s nodes, %s' % (level.name, 'no limit of' if nodes is None else nodes,
+                                    'no time limit' if seconds is None else 'at most %.2fs per move' % seconds))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : parallel.py
+# Description : jeux Othello, recherche alpha-beta répartie sur les coeurs du processeur
+# modification: 2026/10/17
+########################################################################
+
+import os, signal, time, multiprocessing
+from bitboard import BitboardGame
+from transposition import TranspositionTable
+from search import Search
+from game import SearchTimeout
+from stats import move_stats
+from evaluation import Evaluator
+
+_worker = {}    #state of a worker process: game, search (with its transposition table) and evaluator
+
+#worker process initialization: the table stays warm from one move to the other, cancel stops the searches once set
+def _init_worker(game_class, table_entries, cancel):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   #CTRL+C is handled by the main process
+    game = game_class()
+    _worker['game'] = game
+    _worker['search'] = Search(game, TranspositionTable(game, entries=table_entries))
+    _worker['search'].cancel = cancel
+    _worker['evaluator'] = Evaluator(game)
+
+#value for player of move searched at depth, within the window (alpha, beta), and the search counters
+#evaluate_name: a Game method, or "evaluator" for an evaluation.Evaluator
+#SearchTimeout once past deadline or node_limit (see Search.new_search)
+def _search_move(player, board, move, depth, evaluate_name, alpha, beta, deadline=None, node_limit=None):
+    game, search = _worker['game'], _worker['search']
+    search.table.use_evaluate(evaluate_name)
+    evaluate = _worker['evaluator'] if evaluate_name == 'evaluator' else getattr(game, evaluate_name)
+    opp = game.opponent(player)
+    game.make_move(move, player, board)
+    search.new_search(opp, board, evaluate, deadline, node_limit)
+    value = -game.alphabeta(opp, board, -beta, -alpha, depth-1, evaluate, search)[0]
+    return value, (search.nodes, search.leaves, search.cutoffs, search.hits)
+
+
+class ParallelSearcher:
+    """Root splitting of alphabeta over a pool of worker processes.
+
+    The first root move is searched alone with the full window, then the other ones in parallel with
+    the window raised by its value (young brothers wait). Root moves are sorted by SQUARE_WEIGHTS and
+    ties go to the first one, so the move is the one of a new serial alphabeta_searcher at the same depth.
+    Workers are started once by start() and reused for every move and every game, each one keeping
+    its own transposition table between moves.
+    """
+    def __init__(self, game, workers=None, table_entries=TranspositionTable.DEFAULT_ENTRIES):
+        self.game = game
+        self.workers = workers or os.cpu_count() or 1
+        self.table_entries = table_entries
+        self.pool = None
+        self.cancel = multiprocessing.Event()   #stops the running search of the workers once set
+        self.counters = (0, 0, 0, 0)    #nodes, leaves, cutoffs and table hits of the last search, summed over the workers
+
+    #start the worker processes
+    def start(self):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                             initargs=(type(self.game), self.table_entries, self.cancel))
+        return self
+
+    #stop the worker processes
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    #(value, best move) for player, searched at depth by the workers, SearchTimeout if cancelled meanwhile,
+    #once past deadline or when the nodes of the whole search go over node_limit: the first move gets node_limit,
+    #each one of the other moves what it left
+    def alphabeta(self, player, board, depth, evaluate_name, deadline=None, node_limit=None):
+        self.start()
+        game = self.game
+        moves = game.legal_moves(player, board)
+        weights = game.SQUARE_WEIGHTS
+        moves.sort(key=lambda m: weights[m], reverse=True)
+        alpha, beta = game.MIN_VALUE, game.MAX_VALUE
+        best_value, counters = self.pool.apply(_search_move, (player, list(board), moves[0], depth, evaluate_name, alpha, beta,
+                                                              deadline, node_limit))
+        best_move = moves[0]
+        totals = [counters[0] + 1] + list(counters[1:])    #the root node plus the first move subtree
+        left = None if node_limit is None else node_limit - totals[0]
+        tasks = [(player, list(board), move, depth, evaluate_name, best_value, beta, deadline, left) for move in moves[1:]]
+        results = [self.pool.apply_async(_search_move, task) for task in tasks]
+        try:
+            for move, result in zip(moves[1:], results):
+                val, counters = result.get()
+                totals = [t + n for t, n in zip(totals, counters)]
+                if val > best_value:
+                    best_value, best_move = val, move
+        except SearchTimeout:
+            for result in results:  #the other tasks stop too, at their own limits or at once while cancel is set
+                result.wait()
+            raise
+        if node_limit is not None and totals[0] > node_limit:
+            raise SearchTimeout()
+        self.counters = tuple(totals)
+        return best_value, best_move
+
+    #strategy searching at depth on the workers, solving the endgame and looking up the book like Game.alphabeta_searcher
+    #strategy.stats: statistics of the last move (see stats.move_stats), strategy.cancel: the cancel event
+    def searcher(self, depth, endgame=True, book=None):
+        from endgame import EndgameSolver
+        game = self.game
+        solver = EndgameSolver(game) if endgame else None
+        if solver is not None:
+            solver.cancel = self.cancel
+        def search(player, board, evaluate_name, start):
+            move = self.alphabeta(player, board, depth, evaluate_name)[1]
+            strategy.stats = move_stats('search', time.monotonic() - start, depth, *self.counters)
+            return move
+        def strategy(player, board):
+            start = time.monotonic()
+            move = book.lookup(player, board) if book is not None else None
+            if move is not None:
+                strategy.stats = move_stats('book', time.monotonic() - start)
+                return move
+            if game.empty_pieces(board) > game.EMPTY_THRESOLD:
+                return search(player, board, 'weighted_score', start)
+            if solver is not None and solver.likely(game.empty_pieces(board)):
+                try:
+                    move = solver.solve(player, board)[1]
+                    strategy.stats = move_stats('endgame', time.monotonic() - start, game.empty_pieces(board), solver.nodes)
+                    return move
+                except SearchTimeout:
+                    pass
+            return search(player, board, 'final_value', start)
+        strategy.cancel = self.cancel
+        strategy.stats = None
+        return strategy
+
+
+if __name__ == '__main__':
+    from endgame import random_position
+    import random
+    game = BitboardGame()
+    parallel = ParallelSearcher(game).start()
+    rnd = random.Random(1)
+    for n in range(3):
+        player, board = random_position(game, 40, rnd)
+        start = time.perf_counter()
+        serial = game.alphabeta_searcher(5, endgame=False)(player, board)
+        middle = time.perf_counter()
+        value, move = parallel.alphabeta(player, board, 5, 'weighted_score')
+        end = time.perf_counter()
+        print('serial %s in %.2fs, %d workers %s in %.2fs' % (serial, middle - start, parallel.workers, move, end - middle))
+    parallel.close()
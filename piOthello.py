@@ -6,43 +6,68 @@
 # modification: 2019/12/10
 ########################################################################
 
-import time, os
-from game import Game
+import time
+STARTED = time.monotonic()      # process start, origin of the startup timing report
+import os, argparse, threading, concurrent.futures
+from bitboard import BitboardGame
+from parallel import ParallelSearcher
+from levels import LEVELS, LevelEngine
+from book import OpeningBook
+from ponder import Ponderer
+from server import EngineClient
+from record import GameLog
+from stats import StatsLog, Profiler, move_stats, format_stats
 from ledMatrixBicolor import ledMatrix
-import RPi.GPIO as GPIO
+import hardware
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book.bin')   # built by: python3 book.py build
 
 class Application:
-    def __init__(self):
+    #workers: search processes of the IA levels, one per core if None
+    #hw: hardware backend, the Raspberry Pi one if None (see hardware.py)
+    #stats_log: JSONL file where the statistics of each AI move are appended (see stats.py), None: no log
+    #profile: path prefix of the cProfile files of the AI strategies, written by destroy(), None: no profiling
+    #remote: "host:port" of a server.GameServer searching the AI moves, None: searched here
+    #records: game log where each finished game is appended (see record.py), None: no log
+    def __init__(self, workers=None, hw=None, stats_log=None, profile=None, remote=None, records=None):
         print('Démarrage piOthello. CTRL+C pour interrompre, ou appuyer sur le bouton Off.')
         self.off = False                                                # True: switching off the raspberry
-        self.game=Game()
-        self.plateau=ledMatrix()
+        self.timings = [('start', time.monotonic() - STARTED)]          # startup timing report: (step, seconds since process start)
+        self.resources = {}                                             # engines and strategies built on first use (see resource)
+        self.resources_lock = threading.RLock()
+        self.stats_log = StatsLog(stats_log)                            # AI moves statistics
+        self.records = GameLog(records) if records else None             # finished games
+        self.profile = profile
+        self.remote = remote
+        self.hw = hw or hardware.PiBackend()                            # GPIO and led matrix, real or simulated
+        self.game=BitboardGame()                                        # Othello rules running on bitboards
+        self.parallel = ParallelSearcher(self.game, workers)            # search processes, one per core by default, started on first use
+        self.ponderer = Ponderer(self.game)                             # AI searching its replies while the human thinks
+        self.searcher = concurrent.futures.ThreadPoolExecutor(1)        # AI move searched while the leds are animated
+        self.plateau=ledMatrix(self.hw.matrix(), self.hw.sleep)
         self.PLAYER_COLORS = {self.game.BLACK: self.plateau.RED,        # black player is: RED
                               self.game.WHITE: self.plateau.GREEN,      # white player is: GREEN
                               self.game.EMPTY: self.plateau.OFF}        # empty case: led OFF
         self.MOVE_COLOR = self.plateau.YELLOW                           # possible move: YELLOW
 
-        #strategy setup: human or 3 level with increasing IA skills
-        self.PLAYER_ITEMS = ['humain', 'IA0', 'IA1', 'IA2']
-        self.PLAYERS_STRATEGY = {self.PLAYER_ITEMS[0]: self.human_strategy,              # played by human using push button
-                                 self.PLAYER_ITEMS[1]: self.game.random_strategy ,       # random play
-                                 self.PLAYER_ITEMS[2]: self.game.maximizer(),            # simple IA: best move without any anticipation
-                                 self.PLAYER_ITEMS[3]: self.game.alphabeta_searcher(5)}  # IA brute force anticipating 5 next turns.
+        #strategy setup: human or the levels of levels.LEVELS with increasing IA skills
+        self.PLAYER_ITEMS = ['humain'] + [level.name for level in LEVELS]
+        #strategies are built on first use by get_strategy
+        self.PLAYERS_STRATEGY = {self.PLAYER_ITEMS[0]: lambda: self.human_strategy}    # played by human using push button
+        for level in LEVELS:    # node budgets on the shared level engine, or on the remote engine
+            self.PLAYERS_STRATEGY[level.name] = lambda name=level.name: self.engine().strategy(name) if self.remote else self.levels.strategy(name)
                 
         #raspberry GPIO pin setup 
         self.ledRpin = 20                   # Red led PIN
         self.ledGpin = 21                   # Green led PIN
-        GPIO.setup(self.ledRpin, GPIO.OUT)
-        GPIO.setup(self.ledGpin, GPIO.OUT)
+        self.hw.setup_output(self.ledRpin)
+        self.hw.setup_output(self.ledGpin)
         self.pushOFFpin = 26                # push button OFF(black): switch off the Raspberry
         self.pushCHXpin = 17                # push button CHOICE(yellow): to let the user choose an item above x items
         self.pushVALpin = 12                # push button VALIDATION(green): confirm choice validation by the user
-        GPIO.setup(self.pushOFFpin, GPIO.IN, pull_up_down=GPIO.PUD_UP)        # mode INPUT, pull_up=high
-        GPIO.add_event_detect(self.pushOFFpin,GPIO.FALLING,callback=self.buttonOFFEvent, bouncetime=300)
-        GPIO.setup(self.pushCHXpin, GPIO.IN, pull_up_down=GPIO.PUD_UP)        # mode INPUT, pull_up=high
-        GPIO.add_event_detect(self.pushCHXpin,GPIO.FALLING,callback=self.buttonCHXEvent, bouncetime=300)
-        GPIO.setup(self.pushVALpin, GPIO.IN, pull_up_down=GPIO.PUD_UP)        # mode INPUT, pull_up=high
-        GPIO.add_event_detect(self.pushVALpin,GPIO.FALLING,callback=self.buttonVALEvent, bouncetime=500)
+        self.hw.add_button('OFF', self.pushOFFpin, self.buttonOFFEvent, bouncetime=300)
+        self.hw.add_button('CHX', self.pushCHXpin, self.buttonCHXEvent, bouncetime=300)
+        self.hw.add_button('VAL', self.pushVALpin, self.buttonVALEvent, bouncetime=500)
         self.button_CHX_pressed = False  # True if CHX button is pressed
         self.button_VAL_pressed = False  # True if VALID button is pressed
         self.waitingChoice      = False  # True: a choice above x items must be done by the user by pressing CHX button
@@ -80,40 +105,38 @@ class Application:
                            [],             # no red
                            [33,36] ]       # yellow eyes
         
-        self.IA0_GRY  = [ [11,12,13,14,15,16,17,21,27,31,37,41,47,51,53,54,57,61,67,71,72,73,74,75,76,77], # green robot, stupid face
-                          [],             # no red
-                          [33,35,78,88] ] # yellow eyes + yellow level bar graph
-        
-        self.IA1_GRY  = [ [11,12,13,14,15,16,17,21,27,31,37,41,47,51,53,54,55,57,61,67,71,72,73,74,75,76,77], # green robot more agressive face
-                          [33, 35],        # red eyes
-                          [58, 68,78,88] ] # yellow level bar graph
+        self.robot_face = [11,12,13,14,15,16,17,21,27,31,37,41,47,51,57,61,67,71,72,73,74,75,76,77] # green robot face of the IA levels
 
-        
-        self.IA2_GRY  = [ [11,12,13,14,15,16,17,21,27,31,33, 37,41,47,51,57,61,67,71,72,73,74,75,76,77],  # same green robot face
-                          [53,54,55, 33, 35, 18,28,38,48,58,68,78,88], # red eyes, red mouth and red level bar graph
-                          [] ]                                         # no yellow
-        
         self.P1_GRY = [ [],[21,22,23,27,31,34,36,37,41,44,47,51,52,53,57,61,67,71,76,77,78],[] ]      # red P1 
         self.P2_GRY = [ [21,22,23,26,27,31,34,38,41,44,48,51,52,53,56,57,61,66,71,76,77,78], [], [] ] # green P2 
     
            
         #menu strategy choice items
-        self.PLAYER_MENU = {self.PLAYER_ITEMS[0]: self.human_GRY,
-                            self.PLAYER_ITEMS[1]: self.IA0_GRY,
-                            self.PLAYER_ITEMS[2]: self.IA1_GRY,
-                            self.PLAYER_ITEMS[3]: self.IA2_GRY }
+        self.PLAYER_MENU = {self.PLAYER_ITEMS[0]: self.human_GRY}
+        for index, level in enumerate(LEVELS):
+            self.PLAYER_MENU[level.name] = self.level_GRY(index, len(LEVELS))
         self.PLAYER_ICONS = {self.game.BLACK: self.P1_GRY, self.game.WHITE: self.P2_GRY}
         
 
+    #menu icon of the IA level index out of count levels: robot face with a level bar graph growing with the level,
+    #yellow eyes and bar graph for the first half of the levels, red eyes, mouth and bar graph for the second half
+    #--------------------------------------------------------------------------------------------------------------
+    def level_GRY(self, index, count):
+        bar = [88 - 10*n for n in range(max(1, 8 * (index+1) // count))]   # level bar graph on the right column
+        eyes, mouth = [33, 35], [53, 54, 55]
+        if 2 * (index+1) <= count:
+            return [self.robot_face + mouth, [], eyes + bar]
+        return [self.robot_face, eyes + mouth + bar, []]
+
     #executed when OFF is pressed
     #-----------------------------------------------------------
     def buttonOFFEvent(self,channel):
         self.off = True
         print('Extinction Raspberry...')
-        time.sleep(1)
+        self.hw.sleep(1)
         self.plateau.off()      # switch led matrix Off
         self.switch_off_leds()  # switch off all leds
-        os.system('sudo halt')        
+        self.hw.halt()
 
 
     #executed when CHX is pressed
@@ -131,22 +154,82 @@ class Application:
 
     #drawing a pic_GRY [ [Green lc], [Red lc], [Yellow lc] ]  l = line from 1 to 8, c=column from 1 to 8
     def draw_picGRY(self, pic_GRY):
-        for lc in pic_GRY[0]:
-            self.plateau.set_led_lc(lc, self.plateau.GREEN)
-        for lc in pic_GRY[1]:
-            self.plateau.set_led_lc(lc, self.plateau.RED)
-        for lc in pic_GRY[2]:
-            self.plateau.set_led_lc(lc, self.plateau.YELLOW)
+        with self.plateau.batch():      # one frame sent to the matrix
+            for lc in pic_GRY[0]:
+                self.plateau.set_led_lc(lc, self.plateau.GREEN)
+            for lc in pic_GRY[1]:
+                self.plateau.set_led_lc(lc, self.plateau.RED)
+            for lc in pic_GRY[2]:
+                self.plateau.set_led_lc(lc, self.plateau.YELLOW)
                             
 
+    #resource name built by build() on first use, from any thread, its build time added to the timings
+    #---------------------------------------------------------------------------------------------------
+    def resource(self, name, build):
+        with self.resources_lock:
+            if name not in self.resources:
+                start = time.monotonic()
+                self.resources[name] = build()
+                self.timings.append((name + ' (%.3fs)' % (time.monotonic() - start), time.monotonic() - STARTED))
+            return self.resources[name]
+
+    #opening book, memory mapped on first use, None without book file
+    @property
+    def book(self):
+        return self.resource('book', lambda: OpeningBook(self.game, BOOK_FILE) if os.path.exists(BOOK_FILE) else None)
+
+    #engine of the IA levels searching on all the cores, its nodes per second measured on first use
+    @property
+    def levels(self):
+        return self.resource('levels', lambda: LevelEngine(self.game, book=self.book, parallel=self.parallel).calibrate())
+
+    #client of the remote engine, connected on first use
+    def engine(self):
+        host, port = self.remote.rsplit(':', 1)
+        return self.resource('engine', lambda: EngineClient(host, int(port)))
+
+    #strategy of a menu item, built on first use (AI strategies wrapped by a stats.Profiler when profiling)
+    def get_strategy(self, item):
+        def build():
+            strategy = self.PLAYERS_STRATEGY[item]()
+            return Profiler(strategy) if self.profile is not None and item != self.PLAYER_ITEMS[0] else strategy
+        return self.resource('strategy ' + item, build)
+
+    #background warmup during the logo animation: book, search processes, level engine calibration and AI strategies
+    #---------------------------------------------------------------------------------------------------------------
+    def warm_up(self):
+        self.book
+        def start_workers():
+            self.parallel.start()
+            self.parallel.alphabeta(self.game.BLACK, self.game.initial_board(), 1, 'weighted_score')  # processes up and searching
+            return self.parallel
+        if not self.remote:
+            self.resource('workers', start_workers)
+            self.mark('IA levels: %.0f nodes/s' % self.levels.nps)   # startup report: a print from this thread would cut the game output
+        for item in self.PLAYER_ITEMS:
+            self.get_strategy(item)
+
+    #record the time of a startup step
+    def mark(self, step):
+        self.timings.append((step, time.monotonic() - STARTED))
+
+    #print the startup timing report
+    def report_startup(self):
+        print('startup timings (seconds since process start):')
+        for step, seconds in self.timings:
+            print('  %7.3f  %s' % (seconds, step))
+
     #principal loop
     #-----------------------------------------------
     def loop(self):
+        self.mark('hardware and application ready')
+        threading.Thread(target=self.warm_up, daemon=True).start()
         #draw animation start
         self.plateau.off()                 # switch off all the matrix
         for pic_GRY in self.logo_anim_GRY: #animated logo
             self.draw_picGRY(pic_GRY)  # draw one pic from animation list
-            time.sleep(0.5)
+            self.hw.sleep(0.5)
+        self.mark('logo done')
         #keep on playing, until off button is pressed, or CTRL+C is pressed
         while not(self.off) :
             black, white = self.get_players()   #chose level of players above items: human, IA0, IA1, IA2, IA3
@@ -167,30 +250,95 @@ class Application:
         print ('bye')
         self.plateau.off()      # switch led matrix Off
         self.switch_off_leds()  # switch off all leds
+        self.ponderer.stop()    # stop pondering
+        self.parallel.cancel.set()  # stop the AI move being searched, if any, then wait for it
+        for resource in list(self.resources.values()):
+            cancel = getattr(resource, 'cancel', None)
+            if cancel is not None:
+                cancel.set()
+        self.searcher.shutdown(wait=True, cancel_futures=True)
+        self.parallel.close()   # stop search processes
+        if self.resources.get('book') is not None:
+            self.resources['book'].close()   # unmap the opening book
+        self.stats_log.close()
+        if 'engine' in self.resources:
+            self.resources['engine'].close()    # disconnect from the remote engine
+        for name, resource in self.resources.items():
+            if isinstance(resource, Profiler):
+                resource.dump('%s-%s.prof' % (self.profile, name.split()[-1]))  # python3 -m pstats FILE
 
     #Play a game of Othello and return the final board and score
     #Each round consists of:
     # + Get a move from the current player.
     # + Apply it to the board.
     # + Switch players. If the game is over, get the final score.
+    #The AI searches its move in a thread from the start of its turn, during the animations of the last
+    #move and of the possible moves, and ponders during the human turn.
     #------------------------------------------------------------
     def play(self, black_strategy, white_strategy):
         print('Starting a new game')
         board = self.game.initial_board()
         player = self.game.BLACK    #black player always starts
         strategy = lambda who: black_strategy if who == self.game.BLACK else white_strategy
+        moves = []
+        search = self.start_search(strategy, player, board)
         while player is not None and not(self.off):
             self.switch_on_led(player)
             print(self.game.print_board(board))
             self.draw_board(board)
             self.draw_all_possible_moves(player, board)
-            move = self.game.get_move(strategy(player), player, board)
+            if search is None:
+                move = self.game.get_move(strategy(player), player, board)  # human move, on the main thread
+                self.ponderer.stop()
+            else:
+                waiting = time.monotonic()
+                move = self.wait_move(search)
+                if move is None:    # off button pressed
+                    break
+                self.log_move(strategy(player), player, move, board, time.monotonic() - waiting)
             print(self.game.PLAYERS[player], "plays", move)
-            self.draw_move(move, player)
+            moves.append(move)
             self.game.make_move(move, player, board)
-            player = self.game.next_player(board, player)
+            next_player = self.game.next_player(board, player)
+            if next_player is not None:
+                search = self.start_search(strategy, next_player, board)   # runs during draw_move
+            self.draw_move(move, player)
+            player = next_player
+        self.ponderer.stop()    # game over or off button pressed
+        if player is None and self.records is not None:
+            self.records.append(moves)
         return board, self.game.score(self.game.BLACK, board)    
 
+    #start the search of the move of player: future of the AI move, None for a human (the AI opponent ponders)
+    #----------------------------------------------------------------------------------------------------------
+    def start_search(self, strategy, player, board):
+        opp = self.game.opponent(player)
+        if strategy(player) == self.human_strategy:
+            if strategy(opp) != self.human_strategy:
+                self.ponderer.start(player, board, strategy(opp))   # AI thinks during the human turn
+            return None
+        return self.searcher.submit(self.ponderer.get_move, strategy(player), player, list(board))
+
+    #print and log the statistics of an AI move, waited: seconds waited for it after the animations
+    #-----------------------------------------------------------------------------------------------
+    def log_move(self, strategy, player, move, board, waited):
+        stats = move_stats('pondered', 0) if self.ponderer.pondered else getattr(strategy, 'stats', None)
+        if stats is None:   # random strategy
+            return
+        print(format_stats(stats))
+        self.stats_log.write(stats, player=self.game.PLAYERS[player], move=move,
+                             empties=self.game.empty_pieces(board), waited=round(waited, 3))
+
+    #wait for the move searched by start_search, None if the off button is pressed meanwhile
+    #----------------------------------------------------------------------------------------
+    def wait_move(self, search):
+        while not self.off:
+            try:
+                return search.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                pass
+        return None
+
     #get strategy players
     #-----------------------------------------
     def get_players(self):
@@ -200,7 +348,10 @@ class Application:
             self.switch_on_led(player)                      # swhitch on leds regards to player
             self.plateau.off()                              # switch off all the matrix
             self.draw_picGRY(self.PLAYER_ICONS[player])     # draw player icon
-            time.sleep(1)                                   # waiting for 1s
+            if not any(step == 'first menu frame' for step, seconds in self.timings):
+                self.mark('first menu frame')
+                self.report_startup()
+            self.hw.sleep(1)                                   # waiting for 1s
             self.plateau.off()                              # switch off all the matrix
             item=0
             while not(self.button_VAL_pressed) and not self.off:            # VALID button must be pressed for each player
@@ -211,15 +362,15 @@ class Application:
                     if item == len(self.PLAYER_ITEMS):
                         item=0
                     self.plateau.off() # switch off all Matrix
-                time.sleep(0.3)        # to prevent CPU from overwhelming 
+                self.hw.sleep(0.3)        # to prevent CPU from overwhelming 
             #button validation is pressed
             self.button_VAL_pressed = False
-            player_strategy = self.PLAYERS_STRATEGY[self.PLAYER_ITEMS[item]]
+            player_strategy = self.get_strategy(self.PLAYER_ITEMS[item])
             if player==self.game.BLACK:
                 black = player_strategy
             else:
                 white = player_strategy
-            time.sleep(0.3)
+            self.hw.sleep(0.3)
         self.waitingChoice, self.waitingValidation = False, False
         return black, white
 
@@ -238,7 +389,7 @@ class Application:
                 id_move += 1                # next move
                 if id_move == len(moves):
                         id_move=0
-            time.sleep(0.3)     # to prevent CPU from overwhelming
+            self.hw.sleep(0.3)     # to prevent CPU from overwhelming
         #button validation is pressed
         self.button_VAL_pressed = False
         self.waitingChoice, self.waitingValidation = False, False
@@ -248,51 +399,71 @@ class Application:
     #draw the board on the led Matrix
     #---------------------------------------------------------
     def draw_board(self, board):
-        for lc in self.game.valid_squares:
-            self.plateau.set_led_lc(lc, self.PLAYER_COLORS[board[lc]]) #that simple !
+        with self.plateau.batch():      # one frame sent to the matrix
+            for lc in self.game.valid_squares:
+                self.plateau.set_led_lc(lc, self.PLAYER_COLORS[board[lc]]) #that simple !
 
     #draw move chosen by a player
     #--------------------------------------------------------
     def draw_move(self, move, player):
         for n in range(3): #blinking from player color to MOVE_COLOR 3 times
             self.plateau.set_led_lc(move, self.PLAYER_COLORS[player])
-            time.sleep(0.2)
+            self.hw.sleep(0.2)
             self.plateau.set_led_lc(move, self.PLAYER_COLORS[self.game.EMPTY])
-            time.sleep(0.2)    
+            self.hw.sleep(0.2)    
 
     #draw all possible moves by a player given a board
     #-------------------------------------------------
     def draw_all_possible_moves(self, player, board):
         moves = self.game.legal_moves(player, board)
         for n in range(3):
-            for move in moves:
-                self.plateau.set_led_lc(move, self.MOVE_COLOR)
-            time.sleep(0.2)
-            for move in moves:
-                self.plateau.set_led_lc(move, self.PLAYER_COLORS[self.game.EMPTY])
-            time.sleep(0.2)
+            with self.plateau.batch():
+                for move in moves:
+                    self.plateau.set_led_lc(move, self.MOVE_COLOR)
+            self.hw.sleep(0.2)
+            with self.plateau.batch():
+                for move in moves:
+                    self.plateau.set_led_lc(move, self.PLAYER_COLORS[self.game.EMPTY])
+            self.hw.sleep(0.2)
 
     #switch on/off leds regards to current player
     #---------------------------------------------
     def switch_on_led(self, player):
-        GPIO.output(self.ledRpin, player == self.game.BLACK and GPIO.HIGH or GPIO.LOW) 
-        GPIO.output(self.ledGpin, player == self.game.WHITE and GPIO.HIGH or GPIO.LOW) 
+        self.hw.output(self.ledRpin, player == self.game.BLACK)
+        self.hw.output(self.ledGpin, player == self.game.WHITE)
 
     def switch_off_leds(self):
-            GPIO.output(self.ledRpin, GPIO.LOW)  #switch off red led
-            GPIO.output(self.ledGpin, GPIO.LOW)  #switch off green led
+            self.hw.output(self.ledRpin, False)  #switch off red led
+            self.hw.output(self.ledGpin, False)  #switch off green led
 
     def blink_led(self, player):
         for n in range(30):
             self.switch_on_led(player)
-            time.sleep(0.1)
+            self.hw.sleep(0.1)
             self.switch_off_leds()
-            time.sleep(0.1)
+            self.hw.sleep(0.1)
       
     
+#simulated button presses "DELAY:BUTTON DELAY:BUTTON ...", such as "2:CHX 1:VAL 1:VAL 120:OFF"
+def parse_script(text):
+    return [(float(token.split(':')[0]), token.split(':')[1].upper()) for token in text.split()]
+
 if __name__ == '__main__':
-    appl=Application()
+    parser = argparse.ArgumentParser(description='piOthello')
+    parser.add_argument('--sim', metavar='SCRIPT', help='run on simulated hardware with scripted button presses, such as "2:CHX 1:VAL 1:VAL 120:OFF"')
+    parser.add_argument('--speed', type=float, default=None, help='simulated seconds per real second (default: no wait at all)')
+    parser.add_argument('--stats-log', metavar='FILE', help='append the statistics of each AI move to this JSONL file')
+    parser.add_argument('--profile', metavar='PREFIX', help='profile the AI strategies, written to PREFIX-<level>.prof on exit')
+    parser.add_argument('--remote', metavar='HOST:PORT', help='search the AI moves on a server.py engine')
+    parser.add_argument('--record', metavar='FILE', help='append each finished game to this game log (see record.py)')
+    args = parser.parse_args()
+    hw = hardware.SimBackend(parse_script(args.sim), args.speed) if args.sim is not None else None
+    appl=Application(hw=hw, stats_log=args.stats_log, profile=args.profile, remote=args.remote, records=args.record)
     try:
         appl.loop()
     except KeyboardInterrupt:  # interruption clavier CTRL-C: appel à la méthode destroy() de appl.
-        appl.destroy()
+        pass
+    finally:
+        if hw is not None:
+            print('%d frames in %.1f simulated seconds' % (len(hw.frames), hw.clock))
+    appl.destroy()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : ponder.py
+# Description : jeux Othello, réflexion de l'IA pendant le tour du joueur humain
+# modification: 2026/10/17
+########################################################################
+
+import threading
+from position import Position
+from symmetry import transform_move, restore_move
+from game import SearchTimeout
+
+class Ponderer:
+    """Searches the replies of an AI strategy while its (human) opponent is thinking.
+
+    start() runs a background thread playing each legal move of the human in turn, likely ones first
+    (SQUARE_WEIGHTS order), and storing the strategy's reply to the resulting board, once for the symmetric
+    boards (replies are stored under the canonical key of symmetry.py). The searches also
+    warm the strategy's transposition tables. get_move() then answers at once when the human played
+    a pondered move. A strategy is not thread safe: searches are serialized by a lock, so get_move waits
+    for the running ponder search, which is the one of the move just played when the human picks a likely one.
+    Strategies having a cancel event (strategy.cancel, see Game.alphabeta_searcher) are stopped by stop()
+    in the middle of a ponder search, so get_move doesn't wait for the search of a move not played.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.strategy = None
+        self.replies = {}       #canonical key -> move of strategy, in the orientation of the canonical position
+        self.pondered = False   #True when the last get_move came from the pondered replies
+        self.cancel = None      #cancel event of the strategy during a ponder search, None: no ponder search running
+        self.cancel_lock = threading.Lock()
+
+    #ponder the replies of strategy to the moves of player on board
+    def start(self, player, board, strategy):
+        self.stop()
+        self.join()
+        self.strategy = strategy
+        self.replies = {}
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, args=(player, list(board), strategy), daemon=True)
+        self.thread.start()
+
+    #stop pondering, the running search being cancelled if the strategy can be, without waiting for it
+    def stop(self):
+        with self.cancel_lock:
+            self.stopped.set()
+            if self.cancel is not None:
+                self.cancel.set()
+
+    #wait for the end of the pondering thread
+    def join(self):
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    #the moves of the human are played on compact positions (see position.py), the strategy searching list boards
+    def _run(self, player, board, strategy):
+        weights = self.game.SQUARE_WEIGHTS
+        position = Position.from_board(player, board)
+        for move in sorted(position.legal_moves(), key=lambda m: weights[m], reverse=True):
+            with self.lock:
+                if self.stopped.is_set():
+                    return
+                after = position.play(move).next()
+                if after is not None and after.player != position.player:  #no reply to ponder if the opponent has to pass or the game is over
+                    key, n = after.canonical_key()
+                    if key not in self.replies:
+                        reply = self._search(strategy, after.side(), after.to_board())
+                        if reply is not None:
+                            self.replies[key] = transform_move(reply, n)
+
+    #reply of strategy, None if cancelled by stop()
+    def _search(self, strategy, player, board):
+        with self.cancel_lock:
+            if self.stopped.is_set():
+                return None
+            self.cancel = getattr(strategy, 'cancel', None)
+        try:
+            reply = strategy(player, list(board))
+        except SearchTimeout:
+            reply = None
+        finally:
+            with self.cancel_lock:
+                if self.cancel is not None and self.cancel.is_set():
+                    reply = None    #a cancelled search may return the move of a lower depth
+                    self.cancel.clear()
+                self.cancel = None
+        return reply
+
+    #move of strategy for player: the pondered reply if known, else the one searched now
+    def get_move(self, strategy, player, board):
+        with self.lock:
+            move = None
+            if strategy is self.strategy:
+                key, n = Position.from_board(player, board).canonical_key()
+                if key in self.replies:
+                    move = restore_move(self.replies[key], n)
+        self.pondered = move is not None
+        if move is not None:
+            return move
+        return self.game.get_move(strategy, player, board)
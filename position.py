@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : position.py
+# Description : jeux Othello, position compacte (plateau sur 100 octets, joueur au trait)
+# modification: 2026/10/17
+########################################################################
+
+from game import RAYS, NEIGHBORS, VALID_SQUARES, Game
+from transposition import ZobristHasher
+from symmetry import SQUARE_MAPS
+
+#cell codes of the bytearray board, in the order of Game.PIECES
+EMPTY, BLACK, WHITE, OUTER = 0, 1, 2, 3
+_GAME = Game()
+PIECES = _GAME.PIECES
+CODES = {piece: code for code, piece in enumerate(PIECES)}
+_ENCODE = bytes.maketrans(''.join(PIECES).encode(), bytes(range(4)))
+_DECODE = bytes.maketrans(bytes(range(4)), ''.join(PIECES).encode())
+_HASHER = ZobristHasher(_GAME)
+KEYS = (None, _HASHER.keys[_GAME.BLACK], _HASHER.keys[_GAME.WHITE])     #Zobrist keys by cell code
+SIDE_KEY = _HASHER.side
+
+#is there a bracket for own from empty square move?
+def _has_bracket(cells, move, own, opp):
+    for ray in RAYS[move]:
+        if cells[ray[0]] == opp:
+            for sq in ray[1:]:
+                piece = cells[sq]
+                if piece != opp:
+                    if piece == own:
+                        return True
+                    break
+    return False
+
+
+class Position:
+    """A board and the player to move, in 100 bytes instead of a 100 pointers list.
+
+    cells[sq] holds the cell codes EMPTY, BLACK, WHITE, OUTER and player is BLACK or WHITE. The disc
+    counts are kept up to date by play(), while the legal moves, the Zobrist key (the one of
+    transposition.ZobristHasher, so TranspositionTable and the opening book can use it) and the canonical key
+    are computed on first use and cached: positions are immutable, play() returns a new one.
+    The Ponderer walks the moves of the human with positions and keys its replies by their canonical key.
+    """
+    __slots__ = ('cells', 'player', 'black', 'white', '_moves', '_key', '_canonical')
+
+    def __init__(self, cells, player, black=None, white=None):
+        self.cells = cells
+        self.player = player
+        self.black = cells.count(BLACK) if black is None else black
+        self.white = cells.count(WHITE) if white is None else white
+        self._moves = None
+        self._key = None
+        self._canonical = None
+
+    #position of a Game board, player being Game.BLACK or Game.WHITE
+    @classmethod
+    def from_board(cls, player, board):
+        return cls(bytearray(''.join(board).encode().translate(_ENCODE)), CODES[player])
+
+    #Game board of the position
+    def to_board(self):
+        return list(self.cells.translate(_DECODE).decode())
+
+    #Game player to move
+    def side(self):
+        return PIECES[self.player]
+
+    def opponent(self):
+        return BLACK + WHITE - self.player
+
+    def empties(self):
+        return 64 - self.black - self.white
+
+    #discs of the player to move minus the opponent's ones
+    def score(self):
+        return self.black - self.white if self.player == BLACK else self.white - self.black
+
+    #legal moves of the player to move, in increasing order
+    def legal_moves(self):
+        if self._moves is None:
+            cells, own, opp = self.cells, self.player, BLACK + WHITE - self.player
+            frontier = set()
+            for sq in VALID_SQUARES:
+                if cells[sq] == opp:
+                    for n in NEIGHBORS[sq]:
+                        if cells[n] == EMPTY:
+                            frontier.add(n)
+            self._moves = [sq for sq in sorted(frontier) if _has_bracket(cells, sq, own, opp)]
+        return self._moves
+
+    def is_legal(self, move):
+        return move in self.legal_moves()
+
+    #position after the player to move plays move
+    def play(self, move):
+        cells = bytearray(self.cells)
+        own, opp = self.player, BLACK + WHITE - self.player
+        cells[move] = own
+        flipped = 0
+        for ray in RAYS[move]:
+            if cells[ray[0]] == opp:
+                for i, sq in enumerate(ray):
+                    piece = cells[sq]
+                    if piece != opp:
+                        if piece == own:
+                            for sq in ray[:i]:
+                                cells[sq] = own
+                            flipped += i
+                        break
+        if own == BLACK:
+            return Position(cells, opp, self.black + flipped + 1, self.white - flipped)
+        return Position(cells, opp, self.black - flipped, self.white + flipped + 1)
+
+    #same board, the opponent to move
+    def pass_move(self):
+        return Position(self.cells, BLACK + WHITE - self.player, self.black, self.white)
+
+    #position to play next, the player having to pass if needed: None when the game is over
+    def next(self):
+        if self.legal_moves():
+            return self
+        other = self.pass_move()
+        return other if other.legal_moves() else None
+
+    #Zobrist key of the position
+    def key(self):
+        if self._key is None:
+            cells = self.cells
+            h = SIDE_KEY if self.player == WHITE else 0
+            for sq in VALID_SQUARES:
+                code = cells[sq]
+                if code == BLACK or code == WHITE:
+                    h ^= KEYS[code][sq]
+            self._key = h
+        return self._key
+
+    #(key, n): smallest Zobrist key of the 8 symmetric positions and the symmetry n giving it (see symmetry.canonical_key)
+    def canonical_key(self):
+        if self._canonical is None:
+            cells = self.cells
+            pieces = [(KEYS[cells[sq]], sq) for sq in VALID_SQUARES if cells[sq] == BLACK or cells[sq] == WHITE]
+            side = SIDE_KEY if self.player == WHITE else 0
+            best = None
+            for n, perm in enumerate(SQUARE_MAPS):
+                h = side
+                for keys, sq in pieces:
+                    h ^= keys[perm[sq]]
+                if best is None or h < best[0]:
+                    best = (h, n)
+            self._canonical = best
+        return self._canonical
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.player == other.player and self.cells == other.cells
+
+    def __hash__(self):
+        return self.key()
+
+    def __repr__(self):
+        return 'Position(%s to move, %d-%d)' % (PIECES[self.player], self.black, self.white)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : record.py
+# Description : jeux Othello, enregistrement des parties
+#               une partie = un octet par coup (case 11..88), terminée par un octet 0,
+#               journal en ajout seul, relecture en flux (générateurs), import de transcriptions "f5d6c3..."
+#               usage: python3 record.py import transcripts.txt -o games.rec
+#                      python3 record.py stats games.rec
+#                      python3 record.py export games.rec
+# modification: 2026/10/17
+########################################################################
+
+import argparse
+
+END = 0                 #end of game byte, no square has index 0
+CHUNK = 1 << 16         #bytes read at once when streaming a log
+
+#move in "f5" notation (column a-h, row 1-8) to square, and back. Raises ValueError on a bad move.
+def parse_move(text):
+    if len(text) != 2 or text[0].lower() not in 'abcdefgh' or text[1] not in '12345678':
+        raise ValueError('bad move %r' % text)
+    return 10 * int(text[1]) + 'abcdefgh'.index(text[0].lower()) + 1
+
+def format_move(square):
+    return 'abcdefgh'[square % 10 - 1] + str(square // 10)
+
+#moves of a transcript such as "f5d6c3d3c4f4" (spaces allowed), and back
+def parse_transcript(text):
+    text = ''.join(text.split())
+    return [parse_move(text[i:i+2]) for i in range(0, len(text), 2)]
+
+def format_transcript(moves):
+    return ''.join(format_move(move) for move in moves)
+
+#game record of moves: one byte per move plus the end byte
+def encode(moves):
+    return bytes(moves) + bytes((END,))
+
+
+class GameLog:
+    """Append-only file of game records, read back one game at a time.
+
+    A record is the sequence of the squares played, one byte each, passes being deduced from the rules
+    on replay, then an END byte: about 61 bytes per game. append() writes a whole record at once, so an
+    interrupted run loses at most the game being written: its partial record is cut off by repair() when
+    the log is opened again, instead of being glued to the next game appended.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.repair()
+
+    #truncate the log after its last END byte, returns the number of bytes cut off
+    def repair(self):
+        try:
+            f = open(self.path, 'r+b')
+        except FileNotFoundError:
+            return 0
+        with f:
+            size = end = f.seek(0, 2)
+            while end > 0:      #backward scan by chunks
+                start = max(0, end - CHUNK)
+                f.seek(start)
+                last = f.read(end - start).rfind(bytes((END,)))
+                if last >= 0:
+                    end = start + last + 1
+                    break
+                end = start
+            if end < size:
+                f.truncate(end)
+        return size - end
+
+    #append a game given by its moves
+    def append(self, moves):
+        with open(self.path, 'ab') as f:
+            f.write(encode(moves))
+
+    #append many games at once, returns their number
+    def extend(self, games):
+        count = 0
+        with open(self.path, 'ab') as f:
+            for moves in games:
+                f.write(encode(moves))
+                count += 1
+        return count
+
+    #the moves of each game, read by chunks: the log is never loaded as a whole
+    def games(self):
+        rest = b''
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK)
+                if not chunk:
+                    break
+                records = (rest + chunk).split(bytes((END,)))
+                rest = records.pop()
+                for record in records:
+                    yield list(record)
+
+    def __iter__(self):
+        return self.games()
+
+
+#positions of a game: (player, board, move) before each move, the board being updated in place (copy it to keep it),
+#then (None, final board, None). Raises ValueError on an illegal move.
+def replay(game, moves):
+    board, player = game.initial_board(), game.BLACK
+    for move in moves:
+        if player is None or not game.check(move, player, board):
+            raise ValueError('illegal move %s in game %s' % (move, format_transcript(moves)))
+        yield player, board, move
+        game.make_move(move, player, board)
+        player = game.next_player(board, player)
+    yield None, board, None
+
+#final board of a game
+def final_board(game, moves):
+    for player, board, move in replay(game, moves):
+        pass
+    return board
+
+
+if __name__ == '__main__':
+    from game import Game
+    parser = argparse.ArgumentParser(description='Othello game records')
+    parser.add_argument('command', choices=['import', 'export', 'stats'])
+    parser.add_argument('path', help='transcripts file (import) or game log (export, stats)')
+    parser.add_argument('-o', '--out', default='games.rec', help='game log written by import')
+    args = parser.parse_args()
+    game = Game()
+    if args.command == 'import':
+        skipped = 0
+        def legal_games(lines):     #moves of the readable and legal games, the other ones being skipped
+            global skipped
+            for line in lines:
+                if line.strip() and not line.startswith('#'):
+                    try:
+                        moves = parse_transcript(line)
+                        final_board(game, moves)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    yield moves
+        with open(args.path) as f:
+            print('%d games imported, %d bad games skipped' % (GameLog(args.out).extend(legal_games(f)), skipped))
+    elif args.command == 'export':
+        for moves in GameLog(args.path):
+            print(format_transcript(moves))
+    else:
+        count = moves_count = black_wins = draws = skipped = 0
+        for moves in GameLog(args.path):
+            try:
+                score = game.score(game.BLACK, final_board(game, moves))
+            except ValueError:      #not a legal game
+                skipped += 1
+                continue
+            count += 1
+            moves_count += len(moves)
+            black_wins += score > 0
+            draws += score == 0
+        print('%d games, %.1f moves per game, black wins %d, draws %d, white wins %d, %d bad games skipped'
+              % (count, moves_count / max(count, 1), black_wins, draws, count - black_wins - draws, skipped))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : search.py
+# Description : jeux Othello, état partagé par les noeuds d'une recherche alpha-beta:
+#               table de transposition, limite de temps, ordre des coups et compteurs
+# modification: 2026/10/17
+########################################################################
+
+import time
+
+class Search:
+    """State of the alphabeta searches of one strategy.
+
+    Moves are tried in this order: hash move (best move stored in the transposition table),
+    killer moves of the ply (last moves making a cutoff at the same distance from the root),
+    history table (cutoffs made by the move anywhere in the tree, weighted by depth*depth),
+    then the static SQUARE_WEIGHTS of the game. Up to PARITY_EMPTIES empty squares, the moves in a quadrant
+    with an odd number of empties come before the SQUARE_WEIGHTS (region parity).
+    nodes, leaves, cutoffs and hits count the nodes visited, the leaves evaluated, the beta cutoffs made and the
+    positions found in the transposition table since new_search() (see stats.search_stats).
+    Moves are played in place through make_move/unmake_move, which keep the Zobrist key of the position
+    and, when evaluating with weighted_score, the weighted score for black up to date from the flips,
+    as well as the number of empties and the parity of the quadrants (see stability.py).
+    """
+    MAX_PLY = 128       #60 moves plus passes
+    KILLERS = 2         #killer moves kept per ply
+    PARITY_EMPTIES = 12 #up to this number of empties: region parity before the square weights
+    CHECK_NODES = 256   #nodes between two checks of the limits
+
+    def __init__(self, game, table=None, ordering=True):
+        from stability import QUADRANT_BITS    #stability imports bitboard, which imports game, which imports search
+        self.game = game
+        self.quadrants = QUADRANT_BITS
+        self.table = table          #TranspositionTable or None
+        self.ordering = ordering    #False: moves are tried in the legal_moves order (hash move excepted)
+        self.deadline = None        #time.monotonic() limit of the search, None: no limit
+        self.node_limit = None      #nodes limit of the search, None: no limit
+        self.cancel = None          #threading.Event or multiprocessing.Event stopping the search once set, None: none
+        self.next_check = 0         #number of nodes of the next check of the limits
+        self.killers = [[] for ply in range(self.MAX_PLY)]
+        self.history = [0] * 100
+        self.ply = 0
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.hits = 0
+        self.key = 0                #Zobrist key of the current position
+        self.weighted = None        #weighted score of the current position for black, None: not evaluating with weighted_score
+        self.empties = 60           #empty squares of the current position
+        self.parity = 0             #quadrants of the current position with an odd number of empties
+
+    #reset counters before searching a new root position: player to move on board, evaluated by evaluate
+    #the search raises game.SearchTimeout once past deadline or node_limit, or cancelled (see check_limits)
+    def new_search(self, player, board, evaluate, deadline=None, node_limit=None):
+        self.deadline = deadline
+        self.node_limit = node_limit
+        self.next_check = 0
+        self.killers = [[] for ply in range(self.MAX_PLY)]
+        self.history = [h // 2 for h in self.history]   #older cutoffs count less
+        self.ply = 0
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.hits = 0
+        if self.table is not None:
+            self.table.new_search()
+            self.key = self.table.hash(player, board)
+        from stability import board_parity
+        self.empties = self.game.empty_pieces(board)
+        self.parity = board_parity(self.game, board)
+        if evaluate == self.game.weighted_score:
+            self.weighted = self.game.weighted_score(self.game.BLACK, board)
+        else:
+            self.weighted = None
+
+    #change the node limit of the running search
+    def limit_nodes(self, node_limit):
+        self.node_limit = node_limit
+        self.next_check = self.nodes
+
+    #raise game.SearchTimeout once past the deadline or the node limit, or cancelled, else schedule the next check:
+    #called by alphabeta when nodes reaches next_check
+    def check_limits(self):
+        if ((self.deadline is not None and time.monotonic() > self.deadline)
+                or (self.node_limit is not None and self.nodes > self.node_limit)
+                or (self.cancel is not None and self.cancel.is_set())):
+            from game import SearchTimeout     #game imports search
+            raise SearchTimeout()
+        self.next_check = self.nodes + self.CHECK_NODES
+        if self.node_limit is not None:
+            self.next_check = min(self.next_check, self.node_limit + 1)
+
+    #play move in place, return the undo record
+    def make_move(self, move, player, board):
+        flipped = self.game.make_move_undo(move, player, board)
+        undo = (flipped, self.key, self.weighted, self.parity)
+        if self.table is not None:
+            keys = self.table.hasher.keys
+            mine, theirs = keys[player], keys[self.game.opponent(player)]
+            key = self.key ^ mine[move] ^ self.table.hasher.side
+            for sq in flipped:
+                key ^= mine[sq] ^ theirs[sq]
+            self.key = key
+        if self.weighted is not None:
+            weights = self.game.SQUARE_WEIGHTS
+            gain = weights[move]
+            for sq in flipped:
+                gain += 2 * weights[sq]     #from -weight to +weight
+            self.weighted += gain if player == self.game.BLACK else -gain
+        self.empties -= 1
+        self.parity ^= self.quadrants[move]
+        self.ply += 1
+        return undo
+
+    #take back a move played by make_move
+    def unmake_move(self, move, player, board, undo):
+        flipped, self.key, self.weighted, self.parity = undo
+        self.game.unmake_move(move, player, board, flipped)
+        self.empties += 1
+        self.ply -= 1
+
+    #player passes (or, with undo, takes back the pass)
+    def pass_move(self, undo=False):
+        if self.table is not None:
+            self.key ^= self.table.hasher.side
+        self.ply += -1 if undo else 1
+
+    #sort moves in place, most promising first
+    def order(self, moves, hash_move):
+        if self.ordering:
+            killers, history, weights = self.killers[self.ply], self.history, self.game.SQUARE_WEIGHTS
+            if self.empties <= self.PARITY_EMPTIES:
+                odd, quadrants = self.parity, self.quadrants
+                moves.sort(key=lambda m: (m == hash_move, m in killers, history[m], odd & quadrants[m] != 0, weights[m]),
+                           reverse=True)
+            else:
+                moves.sort(key=lambda m: (m == hash_move, m in killers, history[m], weights[m]), reverse=True)
+        elif hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+        return moves
+
+    #move made a beta cutoff at depth
+    def cutoff(self, move, depth):
+        self.cutoffs += 1
+        killers = self.killers[self.ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.KILLERS:]
+        self.history[move] += depth * depth
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : server.py
+# Description : jeux Othello, serveur de parties en réseau (asyncio, JSON par ligne sur TCP)
+#               un hôte puissant joue les coups de l'IA de plusieurs plateaux
+#               serveur: python3 server.py --port 8765
+#               client : python3 piOthello.py --remote hote:8765
+# modification: 2026/10/17
+########################################################################
+
+import os, json, socket, asyncio, argparse, threading, concurrent.futures
+from bitboard import BitboardGame
+from parallel import ParallelSearcher
+from book import OpeningBook
+from tournament import make_strategy
+from levels import LEVELS, LevelEngine
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'book.bin')
+PORT = 8765
+#tournament specs served besides the levels: any other spec is refused, each one built keeping its own
+#tables for good (see GameServer.strategy)
+SPECS = ('random', 'maximizer', 'maximizer:eval', 'alphabeta:4', 'alphabeta:5', 'alphabeta:6', 'alphabeta:4:eval')
+
+#board as the 64 pieces of its valid squares, row by row ("...........................o@......@o..." ), and back
+def encode_board(game, board):
+    return ''.join(board[sq] for sq in game.valid_squares)
+
+def decode_board(game, text):
+    if len(text) != 64 or set(text) - {game.EMPTY, game.BLACK, game.WHITE}:
+        raise ValueError('bad board %r' % text)
+    board = [game.OUTER] * 100
+    for sq, piece in zip(game.valid_squares, text):
+        board[sq] = piece
+    return board
+
+
+#raised by EngineClient when the server answers an error
+class EngineError(Exception):
+    pass
+
+
+class GameServer:
+    """Othello engine for many boards at once, over TCP: one JSON request per line, one JSON response per line.
+
+    A request is {"op": ..., "id": ...} plus the op arguments, the response echoes "id" with "ok": true and the
+    results, or "ok": false and "error". Positions are given either by "session" (games kept by the server, see
+    "new") or by "player" and "board" (see encode_board). Ops:
+      new                               -> session, player, board
+      state        session              -> player, board
+      legal_moves  position             -> moves
+      make_move    position, move       -> player (next player, null: game over), board, score; a session is updated
+      next_player  position             -> player
+      get_move     position, strategy   -> move, stats
+      close        session
+    strategy is a level of piOthello (see levels.LEVELS), "parallel" (alphabeta at depth 5) or one of the
+    tournament specs of SPECS (alphabeta:6, maximizer:eval, ...), the levels and "parallel" searching over all
+    the worker processes.
+    Strategies are built once and shared by all the sessions, so are the opening book, the level engine and the
+    worker processes with their transposition tables. Searches run one at a time.
+    """
+    OPS = ('new', 'state', 'legal_moves', 'make_move', 'next_player', 'get_move', 'close')
+
+    def __init__(self, game=None, workers=None, book_path=BOOK_FILE, specs=SPECS):
+        self.game = game or BitboardGame()
+        self.parallel = ParallelSearcher(self.game, workers)
+        self.book = OpeningBook(self.game, book_path) if book_path and os.path.exists(book_path) else None
+        self.engine = LevelEngine(self.game, book=self.book, parallel=self.parallel).calibrate()
+        self.levels = {level.name: lambda name=level.name: self.engine.strategy(name) for level in LEVELS}
+        self.levels['parallel'] = lambda: self.parallel.searcher(5, book=self.book)
+        self.specs = specs      #tournament specs allowed
+        self.strategies = {}    #spec -> strategy
+        self.sessions = {}      #session id -> [player, board]
+        self.next_session = 1
+        self.executor = concurrent.futures.ThreadPoolExecutor(1)   #searches, out of the event loop
+
+    #strategy of a spec, built on first use, ValueError if it is not a level or an allowed spec
+    def strategy(self, spec):
+        if spec not in self.strategies:
+            if spec in self.levels:
+                self.strategies[spec] = self.levels[spec]()
+            elif spec in self.specs:
+                self.strategies[spec] = make_strategy(self.game, spec)
+            else:
+                raise ValueError('unknown strategy %r' % spec)
+        return self.strategies[spec]
+
+    #(player, board) of a request
+    def position(self, request):
+        if 'session' in request:
+            player, board = self.sessions[request['session']]
+            return player, list(board)
+        return request['player'], decode_board(self.game, request['board'])
+
+    #results of a request, raises an exception on a bad one
+    async def dispatch(self, request):
+        game, op = self.game, request['op']
+        if op not in self.OPS:
+            raise ValueError('unknown op %r' % op)
+        if op == 'new':
+            session = self.next_session
+            self.next_session += 1
+            self.sessions[session] = [game.BLACK, game.initial_board()]
+            return {'session': session, 'player': game.BLACK, 'board': encode_board(game, self.sessions[session][1])}
+        if op == 'close':
+            del self.sessions[request['session']]
+            return {}
+        player, board = self.position(request)
+        if player is None or player not in game.PLAYERS:
+            raise ValueError('no player to move')
+        if op == 'state':
+            return {'player': player, 'board': encode_board(game, board)}
+        if op == 'legal_moves':
+            return {'moves': game.legal_moves(player, board)}
+        if op == 'next_player':
+            return {'player': game.next_player(board, player)}
+        if op == 'make_move':
+            move = request['move']
+            if not game.check(move, player, board):
+                raise ValueError('illegal move %r' % move)
+            game.make_move(move, player, board)
+            player = game.next_player(board, player)
+            if 'session' in request:
+                self.sessions[request['session']] = [player, board]
+            return {'player': player, 'board': encode_board(game, board), 'score': game.score(game.BLACK, board)}
+        if op == 'get_move':
+            strategy = self.strategy(request.get('strategy', 'IA2'))
+            loop = asyncio.get_running_loop()
+            move = await loop.run_in_executor(self.executor, game.get_move, strategy, player, board)
+            return {'move': move, 'stats': getattr(strategy, 'stats', None)}
+
+    #one client connection: requests are answered in order
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    response = dict(await self.dispatch(request), ok=True)
+                except Exception as e:      #bad requests are answered, the connection goes on
+                    request = request if isinstance(request, dict) else {}
+                    response = {'ok': False, 'error': '%s: %s' % (type(e).__name__, e)}
+                response['id'] = request.get('id')
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='0.0.0.0', port=PORT, started=None):
+        server = await asyncio.start_server(self.handle, host, port)
+        if started is not None:
+            started(server.sockets[0].getsockname())
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.parallel.close()
+        if self.book is not None:
+            self.book.close()
+
+
+class EngineClient:
+    """Blocking client of a GameServer, usable from several threads (requests are serialized)."""
+    def __init__(self, host='localhost', port=PORT, timeout=None):
+        self.game = BitboardGame()
+        self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.socket.makefile('rwb')
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+    #send a request: results of the response, EngineError if the server answered an error
+    def request(self, op, **fields):
+        with self.lock:
+            self.next_id += 1
+            self.file.write((json.dumps(dict(fields, op=op, id=self.next_id)) + '\n').encode())
+            self.file.flush()
+            line = self.file.readline()
+        if not line:
+            raise EngineError('connection closed by the server')
+        response = json.loads(line)
+        if not response.pop('ok'):
+            raise EngineError(response['error'])
+        return response
+
+    #move of strategy (a server spec) for player on board, searched by the server
+    def get_move(self, strategy, player, board):
+        return self.request('get_move', strategy=strategy, player=player, board=encode_board(self.game, board))
+
+    #strategy(player, board) searched by the server, strategy.stats being the statistics of its last move
+    def strategy(self, spec):
+        def strategy(player, board):
+            response = self.get_move(spec, player, board)
+            strategy.stats = response['stats']
+            return response['move']
+        strategy.stats = None
+        return strategy
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Othello engine server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('-w', '--workers', type=int, default=None, help='search processes (default: one per core)')
+    args = parser.parse_args()
+    server = GameServer(workers=args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port, lambda address: print('serving on %s:%d' % address[:2])))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
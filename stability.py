@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : stability.py
+# Description : jeux Othello, tables précalculées des pions stables des bords (3^8 configurations)
+#               et parité des régions (quadrants ayant un nombre impair de cases vides)
+# modification: 2026/10/17
+########################################################################
+
+from bitboard import A_FILE, MASKS, SQUARES, popcount
+
+#an edge is 8 cells, cell i being 0 (empty), 1 (a disc of one colour) or 2 (the other colour),
+#pattern index: sum of cell i * 3**i
+EDGE_PATTERNS = 3 ** 8
+POWERS = [3 ** i for i in range(8)]
+#TERNARY[byte]: pattern index of the discs of one colour set in byte, the other colour counting twice
+TERNARY = [sum(POWERS[i] for i in range(8) if byte >> i & 1) for byte in range(256)]
+TERNARY2 = [2 * t for t in TERNARY]
+#SPREAD[byte]: byte moved to the first column, bit i to row i
+SPREAD = [sum(1 << 8*i for i in range(8) if byte >> i & 1) for byte in range(256)]
+GATHER = 0x0102040810204080     #(x & A_FILE) * GATHER: row i of the first column goes to bit 56 + i
+
+#pattern index of the edge after colour plays on empty cell j: the runs of the other colour closed by colour are flipped
+def _play_edge(cells, index, j, colour):
+    index += colour * POWERS[j]
+    for step in (-1, 1):
+        k = j + step
+        while 0 <= k < 8 and cells[k] == 3 - colour:
+            k += step
+        if 0 <= k < 8 and cells[k] == colour:
+            for i in range(j + step, k, step):
+                index += (2*colour - 3) * POWERS[i]     #3 - colour to colour
+    return index
+
+#EDGE_STABLE[pattern]: byte of the discs of the edge which no sequence of moves can flip anymore.
+#An edge disc can only be flipped along its edge; a move may be played on any empty cell (legal thanks to other
+#directions), so a disc is stable when it keeps its colour and stays stable after every move of both colours.
+#A move changes the colour of the flipped discs only, they are left out of the discs kept stable by the move.
+def _edge_table():
+    patterns = [[index // power % 3 for power in POWERS] for index in range(EDGE_PATTERNS)]
+    table = [0] * EDGE_PATTERNS
+    for index in sorted(range(EDGE_PATTERNS), key=lambda index: patterns[index].count(0)):  #fewer empties first
+        cells = patterns[index]
+        stable = sum(1 << i for i in range(8) if cells[i])
+        for j in range(8):
+            if not cells[j]:
+                for colour in (1, 2):
+                    after = _play_edge(cells, index, j, colour)
+                    changed = sum(1 << i for i in range(8) if patterns[after][i] != cells[i])
+                    stable &= table[after] & ~changed
+                    if not stable:
+                        break
+                if not stable:
+                    break
+        table[index] = stable
+    return table
+EDGE_STABLE = _edge_table()
+
+#discs of both colours stable along the 4 edges (see EDGE_STABLE): one table lookup per edge
+def stable_discs(black, white):
+    table = EDGE_STABLE
+    top = table[TERNARY[black & 255] + TERNARY2[white & 255]]
+    bottom = table[TERNARY[black >> 56] + TERNARY2[white >> 56]]
+    left = table[TERNARY[(black & A_FILE) * GATHER >> 56 & 255] + TERNARY2[(white & A_FILE) * GATHER >> 56 & 255]]
+    right = table[TERNARY[(black >> 7 & A_FILE) * GATHER >> 56 & 255] + TERNARY2[(white >> 7 & A_FILE) * GATHER >> 56 & 255]]
+    return top | bottom << 56 | SPREAD[left] | SPREAD[right] << 7
+
+#stable discs of own minus the ones of opp
+def stability(own, opp):
+    stable = stable_discs(own, opp)
+    return popcount(own & stable) - popcount(opp & stable)
+
+
+#region parity: the 4 quadrants of the board, QUADRANT_BITS[sq] being the bit of the quadrant of square sq
+#and PARITY_BITS[1 << k] the one of bit k. A parity is the mask of the quadrants with an odd number of empty
+#squares: playing on sq flips QUADRANT_BITS[sq], so it is kept up to date by a xor per move.
+QUADRANT_BITS = [1 << (2 * (sq // 10 > 4) + (sq % 10 > 4)) if sq in MASKS else 0 for sq in range(100)]
+PARITY_BITS = {1 << k: QUADRANT_BITS[sq] for k, sq in enumerate(SQUARES)}
+
+#parity of the empty squares (a bitboard)
+def parity(empty):
+    odd = 0
+    while empty:
+        move = empty & -empty
+        empty ^= move
+        odd ^= PARITY_BITS[move]
+    return odd
+
+#parity of a list board
+def board_parity(game, board):
+    odd = 0
+    for sq in game.valid_squares:
+        if board[sq] == game.EMPTY:
+            odd ^= QUADRANT_BITS[sq]
+    return odd
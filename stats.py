@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : stats.py
+# Description : jeux Othello, statistiques de recherche par coup,
+#               journal JSONL et profilage (cProfile) des stratégies
+# modification: 2026/10/17
+########################################################################
+
+import json, time, threading, cProfile, pstats
+
+#statistics of one move: source is 'book', 'search', 'endgame', 'maximizer' or 'pondered',
+#branching is the effective branching factor nodes ** (1/depth)
+def move_stats(source, elapsed, depth=0, nodes=0, leaves=0, cutoffs=0, hits=0):
+    return {'source': source, 'time': round(elapsed, 6), 'depth': depth, 'nodes': nodes, 'leaves': leaves,
+            'cutoffs': cutoffs, 'tt_hits': hits, 'branching': round(nodes ** (1 / depth), 2) if depth and nodes else 0.0}
+
+#statistics of a move searched by alphabeta with the counters of search.Search, depth being the last one completed
+def search_stats(search, depth, elapsed):
+    return move_stats('search', elapsed, depth, search.nodes, search.leaves, search.cutoffs, search.hits)
+
+#one line summary of move statistics
+def format_stats(stats):
+    return '%s depth %d, %d nodes, %d leaves, %d cutoffs, %d table hits, branching %.2f, %.3fs' % (
+        stats['source'], stats['depth'], stats['nodes'], stats['leaves'], stats['cutoffs'], stats['tt_hits'],
+        stats['branching'], stats['time'])
+
+
+class StatsLog:
+    """JSONL log of move statistics, appended to path: one JSON object per line. With path None, nothing is written."""
+    def __init__(self, path=None):
+        self.file = open(path, 'a') if path is not None else None
+
+    def write(self, stats, **fields):
+        if self.file is not None:
+            record = dict(fields, **stats)
+            record['at'] = round(time.time(), 3)
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class Profiler:
+    """Strategy wrapper profiling each of its calls with cProfile, in the calling thread.
+
+    The calls are accumulated in one profile, written by dump() for pstats or snakeviz.
+    The attributes of the strategy (stats, search, ...) are read through the wrapper.
+    """
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.profile = cProfile.Profile()
+        self.lock = threading.Lock()    #one profiled call at a time
+
+    def __call__(self, player, board):
+        with self.lock:
+            return self.profile.runcall(self.strategy, player, board)
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
+
+    #write the profile to path
+    def dump(self, path):
+        with self.lock:
+            self.profile.dump_stats(path)
+
+    #print the top functions by cumulative time
+    def print_stats(self, top=20):
+        with self.lock:
+            pstats.Stats(self.profile).sort_stats('cumulative').print_stats(top)
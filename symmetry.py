@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : symmetry.py
+# Description : jeux Othello, les 8 symétries du plateau (rotations et réflexions):
+#               forme canonique d'une position et retour des coups dans l'orientation d'origine
+# modification: 2026/10/17
+########################################################################
+
+from bitboard import SQUARES, BITS
+
+#the 8 symmetries of the square on (row, col), rows and columns from 1 to 8: identity, 3 rotations, 4 reflections
+TRANSFORMS = (lambda r, c: (r, c), lambda r, c: (c, 9-r), lambda r, c: (9-r, 9-c), lambda r, c: (9-c, r),
+              lambda r, c: (r, 9-c), lambda r, c: (9-r, c), lambda r, c: (c, r), lambda r, c: (9-c, 9-r))
+
+#SQUARE_MAPS[n][sq]: square of the 10x10 layout where symmetry n sends sq (outer squares stay in place)
+def _square_map(transform):
+    perm = list(range(100))
+    for sq in SQUARES:
+        r, c = transform(sq // 10, sq % 10)
+        perm[sq] = 10*r + c
+    return perm
+SQUARE_MAPS = [_square_map(transform) for transform in TRANSFORMS]
+#INVERSES[n]: symmetry taking back symmetry n (rotations by 90 degrees go back by 270, the other ones by themselves)
+INVERSES = [next(m for m, back in enumerate(SQUARE_MAPS) if all(back[perm[sq]] == sq for sq in SQUARES))
+            for perm in SQUARE_MAPS]
+#BIT_MAPS[n][k]: bit where symmetry n sends bit k
+BIT_MAPS = [[BITS[perm[SQUARES[k]]] for k in range(64)] for perm in SQUARE_MAPS]
+
+#bit twiddling symmetries of a bitboard (bit 8*row + col)
+def _flip_vertical(x):
+    return int.from_bytes(x.to_bytes(8, 'little'), 'big')
+
+def _mirror_horizontal(x):
+    x = ((x >> 1) & 0x5555555555555555) | ((x & 0x5555555555555555) << 1)
+    x = ((x >> 2) & 0x3333333333333333) | ((x & 0x3333333333333333) << 2)
+    return ((x >> 4) & 0x0F0F0F0F0F0F0F0F) | ((x & 0x0F0F0F0F0F0F0F0F) << 4)
+
+def _flip_diagonal(x):
+    t = 0x0F0F0F0F00000000 & (x ^ (x << 28))
+    x ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (x ^ (x << 14))
+    x ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (x ^ (x << 7))
+    x ^= t ^ (t >> 7)
+    return x & 0xFFFFFFFFFFFFFFFF
+
+#BITBOARD_TRANSFORMS[n](x): bitboard x moved by symmetry n, the same symmetries as SQUARE_MAPS
+BITBOARD_TRANSFORMS = (
+    lambda x: x,
+    lambda x: _mirror_horizontal(_flip_diagonal(x)),
+    lambda x: _flip_vertical(_mirror_horizontal(x)),
+    lambda x: _flip_vertical(_flip_diagonal(x)),
+    _mirror_horizontal,
+    _flip_vertical,
+    _flip_diagonal,
+    lambda x: _flip_vertical(_mirror_horizontal(_flip_diagonal(x))),
+)
+
+#board moved by symmetry n
+def transform_board(board, n):
+    perm = SQUARE_MAPS[n]
+    moved = list(board)
+    for sq in SQUARES:
+        moved[perm[sq]] = board[sq]
+    return moved
+
+#square sq moved by symmetry n, and back
+def transform_move(sq, n):
+    return SQUARE_MAPS[n][sq]
+
+def restore_move(sq, n):
+    return SQUARE_MAPS[INVERSES[n]][sq]
+
+#(canonical own, canonical opp, n): the symmetric bitboards (own, opp) smallest as a pair, and its symmetry n
+def canonical_bitboards(own, opp):
+    best = None
+    for n, transform in enumerate(BITBOARD_TRANSFORMS):
+        pair = (transform(own), transform(opp))
+        if best is None or pair < best[:2]:
+            best = pair + (n,)
+    return best
+
+#(key, n): smallest Zobrist key of the 8 symmetric boards (transposition.ZobristHasher keys) and its symmetry n
+def canonical_key(hasher, player, board):
+    keys = hasher.keys
+    side = hasher.side if player == hasher.game.WHITE else 0
+    pieces = [(keys[board[sq]], sq) for sq in SQUARES if board[sq] in keys]
+    best = None
+    for n, perm in enumerate(SQUARE_MAPS):
+        h = side
+        for piece_keys, sq in pieces:
+            h ^= piece_keys[perm[sq]]
+        if best is None or h < best[0]:
+            best = (h, n)
+    return best
+
+#(canonical board, n) of a board, the canonical one being the smallest of the 8 symmetric boards
+def canonical_board(board):
+    return min((transform_board(board, n), n) for n in range(len(SQUARE_MAPS)))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : tournament.py
+# Description : jeux Othello, tournoi entre stratégies sans matériel (ni matrice ni GPIO)
+#               parties jouées en parallèle, résultats en JSONL, tableau victoires/nuls/défaites et Elo
+#               usage: python3 tournament.py -g 10 -o results.jsonl random maximizer alphabeta:5 alphabeta:4:eval
+# modification: 2026/10/17
+########################################################################
+
+import json, math, time, random, argparse, itertools, multiprocessing
+from bitboard import BitboardGame
+from evaluation import Evaluator
+from levels import LevelEngine
+
+#strategy builders: spec "name:arg:key=value" -> STRATEGIES[name](game, *args, **kwargs)
+#args "eval" stand for an evaluation.Evaluator, numbers are converted
+STRATEGIES = {
+    'random':    lambda game: game.random_strategy,
+    'maximizer': lambda game, evaluate=None: game.maximizer(evaluate),
+    'alphabeta': lambda game, depth=None, evaluate=None, time=None: game.alphabeta_searcher(depth, time_budget=time, evaluate=evaluate),
+    'level':     lambda game, name: LevelEngine(game).strategy(name),
+}
+
+def _value(game, text):
+    if text == 'eval':
+        return Evaluator(game)
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+#strategy of a spec, such as "random", "maximizer:eval", "alphabeta:5", "alphabeta:time=0.5", "level:IA2"
+def make_strategy(game, spec):
+    name, *params = spec.split(':')
+    args = [_value(game, p) for p in params if '=' not in p]
+    kwargs = dict((p.split('=')[0], _value(game, p.split('=')[1])) for p in params if '=' in p)
+    return STRATEGIES[name](game, *args, **kwargs)
+
+#play one game between two specs, opening with random_moves random moves: returns its record
+def play_game(black, white, random_moves=0, seed=0):
+    game = BitboardGame()
+    strategies = {game.BLACK: make_strategy(game, black), game.WHITE: make_strategy(game, white)}
+    rnd = random.Random(seed)
+    board, player = game.initial_board(), game.BLACK
+    moves, times, movers = [], [], []
+    while player is not None:
+        start = time.perf_counter()
+        if len(moves) < random_moves:
+            move = rnd.choice(game.legal_moves(player, board))
+        else:
+            move = game.get_move(strategies[player], player, board)
+        times.append(round(time.perf_counter() - start, 6))
+        moves.append(move)
+        movers.append('b' if player == game.BLACK else 'w')
+        game.make_move(move, player, board)
+        player = game.next_player(board, player)
+    return {'black': black, 'white': white, 'score': game.score(game.BLACK, board), 'moves': moves, 'times': times,
+            'movers': ''.join(movers), 'random_moves': random_moves, 'seed': seed}
+
+def _play_task(args):
+    return play_game(*args)
+
+#games of a round robin: games per pair, colors alternating, the same opening for both colors
+def schedule(specs, games, random_moves=0, seed=0):
+    tasks = []
+    for a, b in itertools.combinations(specs, 2):
+        for n in range(games):
+            black, white = (a, b) if n % 2 == 0 else (b, a)
+            tasks.append((black, white, random_moves, seed + n // 2))
+    return tasks
+
+#play the tasks on a pool of processes, each record is written to the JSONL file out as soon as it is known
+def run(tasks, workers=None, out=None):
+    records = []
+    with multiprocessing.Pool(workers) as pool:
+        for record in pool.imap_unordered(_play_task, tasks):
+            records.append(record)
+            if out is not None:
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+            print('%s - %s: %+d' % (record['black'], record['white'], record['score']))
+    return records
+
+#{spec: [wins, draws, losses]} and {(spec, other): [wins, draws, losses]}
+def results(records):
+    totals, pairs = {}, {}
+    for r in records:
+        for me, other, sign in ((r['black'], r['white'], 1), (r['white'], r['black'], -1)):
+            outcome = 0 if sign * r['score'] > 0 else 1 if r['score'] == 0 else 2
+            totals.setdefault(me, [0, 0, 0])[outcome] += 1
+            pairs.setdefault((me, other), [0, 0, 0])[outcome] += 1
+    return totals, pairs
+
+#Elo ratings fitted on the results (Bradley-Terry, draws as half wins, one virtual draw per pair), mean 0
+def elo(records, iterations=200):
+    totals, pairs = results(records)
+    players = sorted(totals)
+    score = {(a, b): pairs.get((a, b), [0, 0, 0])[0] + 0.5 * pairs.get((a, b), [0, 0, 0])[1] + 0.5
+             for a in players for b in players if a != b}
+    gamma = dict.fromkeys(players, 1.0)
+    for n in range(iterations):
+        for a in players:
+            wins = sum(score[a, b] for b in players if b != a)
+            games = sum((score[a, b] + score[b, a]) / (gamma[a] + gamma[b]) for b in players if b != a)
+            gamma[a] = wins / games
+    ratings = {p: 400 * math.log10(gamma[p]) for p in players}
+    mean = sum(ratings.values()) / len(ratings)
+    return {p: ratings[p] - mean for p in players}
+
+#win/draw/loss table, Elo and mean think time per move of each strategy
+def report(records):
+    totals, pairs = results(records)
+    ratings = elo(records)
+    think = {}
+    for r in records:
+        for color, spec in (('b', r['black']), ('w', r['white'])):
+            think.setdefault(spec, []).extend(t for i, t in enumerate(r['times']) if r['movers'][i] == color and i >= r['random_moves'])
+    width = max(len(spec) for spec in totals)
+    print('%-*s %5s %5s %5s %7s %9s' % (width, 'strategy', 'win', 'draw', 'loss', 'elo', 's/move'))
+    for spec in sorted(totals, key=lambda s: -ratings[s]):
+        w, d, l = totals[spec]
+        times = think.get(spec) or [0]
+        print('%-*s %5d %5d %5d %+7.0f %9.4f' % (width, spec, w, d, l, ratings[spec], sum(times) / len(times)))
+    for (a, b), (w, d, l) in sorted(pairs.items()):
+        if a < b:
+            print('  %s vs %s: %d-%d-%d' % (a, b, w, d, l))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='headless Othello tournament')
+    parser.add_argument('specs', nargs='+', help='strategies: random, maximizer[:eval], alphabeta:DEPTH[:eval], alphabeta:time=SECONDS, level:NAME')
+    parser.add_argument('-g', '--games', type=int, default=2, help='games per pair of strategies')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='processes (default: one per core)')
+    parser.add_argument('-r', '--random-moves', type=int, default=4, help='random opening moves of each game')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-o', '--out', help='JSONL file of the game records (appended)')
+    args = parser.parse_args()
+    out = open(args.out, 'a') if args.out else None
+    try:
+        records = run(schedule(args.specs, args.games, args.random_moves, args.seed), args.workers, out)
+    finally:
+        if out is not None:
+            out.close()
+    report(records)
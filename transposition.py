@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+########################################################################
+# Filename    : transposition.py
+# Description : jeux Othello, table de transposition à clé de Zobrist
+# modification: 2026/10/17
+########################################################################
+
+import random
+from operator import itemgetter
+
+class ZobristHasher:
+    """Zobrist keys of a board: one random 64 bits key per (piece, square) and one for the side to move.
+    Keys come from a fixed seed, so a position has the same hash from one run to the other.
+    """
+    SEED = 20191210
+
+    def __init__(self, game, seed=SEED):
+        rnd = random.Random(seed)
+        self.game = game
+        self.keys = {piece: [0] * 100 for piece in (game.BLACK, game.WHITE)}
+        for piece in (game.BLACK, game.WHITE):
+            for sq in game.valid_squares:
+                self.keys[piece][sq] = rnd.getrandbits(64)
+        self.side = rnd.getrandbits(64)                     #xored when white is to move
+        self.pick = itemgetter(*game.valid_squares)
+
+    #hash key of the board with player to move
+    def hash(self, player, board):
+        h = self.side if player == self.game.WHITE else 0
+        keys = self.keys
+        for sq, piece in zip(self.game.valid_squares, self.pick(board)):
+            if piece in keys:
+                h ^= keys[piece][sq]
+        return h
+
+
+class TranspositionTable:
+    """Fixed size hash table of search results, indexed by Zobrist key.
+
+    Each entry is a tuple (key, depth, flag, value, move, age). The table size is a power of 2,
+    given in entries or in MB. Replacement is depth-preferred: a slot keeps its entry unless the new
+    one is searched at least as deep, or the stored one comes from an older search (see new_search).
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2       #value is exact, a lower bound (fail high) or an upper bound (fail low)
+    ENTRY_BYTES = 160                   #approximate memory used by one entry (slot + tuple + ints)
+    DEFAULT_ENTRIES = 1 << 16
+
+    def __init__(self, game, entries=None, mb=None):
+        if mb is not None:
+            entries = int(mb * (1 << 20)) // self.ENTRY_BYTES
+        elif entries is None:
+            entries = self.DEFAULT_ENTRIES
+        size = 1
+        while size * 2 <= entries:
+            size *= 2
+        self.size = size
+        self.mask = size - 1
+        self.hasher = ZobristHasher(game)
+        self.hash = self.hasher.hash
+        self.evaluate = None    #evaluate function (or its name) of the values stored, see use_evaluate
+        self.clear()
+
+    #remove all entries
+    def clear(self):
+        self.slots = [None] * self.size
+        self.age = 0
+
+    #searches go on with evaluate: the table is cleared when it changes, values stored with another
+    #evaluate function being not comparable
+    def use_evaluate(self, evaluate):
+        if evaluate != self.evaluate:
+            self.clear()
+            self.evaluate = evaluate
+
+    #start a new search: entries of the previous ones become replaceable
+    def new_search(self):
+        self.age += 1
+
+    #entry stored for key, None if not found
+    def probe(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    #store a search result, depth-preferred replacement
+    def store(self, key, depth, flag, value, move):
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is None or entry[0] == key or entry[5] != self.age or depth >= entry[1]:
+            self.slots[index] = (key, depth, flag, value, move, self.age)
+
+    #number of entries used
+    def used(self):
+        return self.size - self.slots.count(None)